@@ -3,12 +3,79 @@
 This module provides functions to process oceanographic data and generate
 slippy map tiles for various data products (SSH, SST, chlorophyll).
 """
-import pandas as pd
+import contextlib
+import logging
+import os
+from datetime import date, datetime, timedelta
 
 from . import config, tile, layer_config
 settings = config.settings
 
-from .utils import vprint, DataObjectError
+from .utils import vprint, set_verbose, DataObjectError, DateInFutureError, run_in_background
+
+logger = logging.getLogger(__name__)
+
+
+# Dates whose sync is held back by deferred_sync(), None outside of it
+_deferred_dates = None
+
+
+def _queue_sync(dtm):
+    """Queue the upload of the tiles of a date and of the layer config."""
+    if _deferred_dates is not None:
+        _deferred_dates.append(dtm)
+        return
+    run_in_background(tile.sync, dtm)
+    run_in_background(layer_config.sync)
+
+
+@contextlib.contextmanager
+def deferred_sync():
+    """Coalesce the syncs of several days into one batch.
+
+    The tile syncs queued by today() and yesterday() inside the block are
+    held back and queued together when the block exits, followed by a
+    single layer config sync instead of one per day.
+
+    Examples
+    --------
+    >>> with deferred_sync():
+    ...     today()
+    ...     yesterday()
+    """
+    global _deferred_dates
+    if _deferred_dates is not None:
+        yield
+        return
+    _deferred_dates = []
+    try:
+        yield
+    finally:
+        dates, _deferred_dates = _deferred_dates, None
+        for dtm in dict.fromkeys(dates):
+            run_in_background(tile.sync, dtm)
+        if dates:
+            run_in_background(layer_config.sync)
+
+
+def _sync_due(sync):
+    """Check if new tiles should be synced to the remote server.
+
+    Each setting is read at most once, and not at all when ``sync`` is
+    False or no tiles were generated.
+
+    Parameters
+    ----------
+    sync : bool
+        Sync requested by the caller.
+
+    Returns
+    -------
+    bool
+        True if sync is requested, new tiles were generated, and
+        ``remote_sync`` is enabled.
+    """
+    return bool(sync and settings.get("tiles_updated") and settings.get("remote_sync"))
 
 
 def day(dtm, force=False, verbose=False):
@@ -39,14 +106,12 @@ def today(force=False, sync=True):
     sync : bool, optional
         Sync tiles to remote server after generation, by default True.
     """
-    dtm = pd.Timestamp.now().normalize()
+    dtm = date.today()
     vprint(f"\n\nProcess today's date: {dtm}")
     tile.all(dtm, force=force, verbose=True)
-    if settings.get("remote_sync") and settings.get("tiles_updated") and sync:
-        print(settings.get("remote_sync"), settings.get("tiles_updated"), sync)
-        print("sync")
-        tile.sync(dtm)
-        layer_config.sync()
+    if _sync_due(sync):
+        logger.info("%s Queue tile and layer config sync", datetime.now())
+        _queue_sync(dtm)
         settings.set("tiles_updated", False)
 
 
@@ -63,26 +128,56 @@ def yesterday(force=False, sync=True, verbose=True):
     sync : bool, optional
         Sync tiles to remote server after generation, by default True.
     """
-    settings.set("verbose", verbose)
-    dtm = pd.Timestamp.now().normalize()-pd.Timedelta(1,"D")
+    set_verbose(verbose)
+    dtm = date.today() - timedelta(days=1)
     vprint(f"\n\nProcess Yesterday's date: {dtm}")
     tile.all(dtm, force=False, verbose=True)
-    if settings.get("remote_sync") and settings.get("tiles_updated") and sync:
-        print("Sync tiles")
-        tile.sync(dtm)
-        print("Tiles synced")
-
-        print(f"{pd.Timestamp.now()} Sync Layer config")
-        layer_config.sync()
+    if _sync_due(sync):
+        logger.info("%s Queue tile and layer config sync", datetime.now())
+        _queue_sync(dtm)
         settings.set("tiles_updated", False)
 
 
 
+def _render_one_day(dtm, tile_workers):
+    """Generate the tiles of one day in a worker process of last_days.
+
+    Parameters
+    ----------
+    dtm : datetime-like
+        The date to generate tiles for.
+    tile_workers : int
+        Number of processes rendering the tiles of each product of the day.
+
+    Returns
+    -------
+    bool
+        True if new tiles were generated.
+    """
+    settings.set("tile_workers", tile_workers)
+    settings.set("tiles_updated", False)
+    tile.all(dtm)
+    return bool(settings.get("tiles_updated"))
+
+
 def last_days(days=7, sync=True):
     """Process tiles for the last N days.
 
     Processes tiles for each day in the range from (today - days) to today,
-    inclusive. Syncs to remote server after processing if configured.
+    inclusive. The data for all days is downloaded up front with one
+    request per product, after which the days are processed concurrently
+    in a process pool sized by the ``day_workers`` setting. Syncs to
+    remote server once all days are finished, if configured.
+
+    Every day renders its three products concurrently, each with a pool
+    of tile workers, so up to ``day_workers * 3 * tile_workers`` processes
+    render at once. ``day_workers`` therefore defaults to the number of
+    CPUs divided by the three products, and the ``tile_workers`` budget is
+    split between the days processed in parallel.
+
+    The day workers are started from a forkserver and import the
+    ``__main__`` module of the caller, so scripts calling this function
+    must do so under an ``if __name__ == "__main__":`` guard.
 
     Parameters
     ----------
@@ -91,11 +186,19 @@ def last_days(days=7, sync=True):
     sync : bool, optional
         Sync tiles to remote server after generation, by default True.
     """
-    dtm1 = pd.Timestamp.now().normalize()-pd.Timedelta(days,"D")
-    dtm2 = pd.Timestamp.now().normalize()
-    for dtm in pd.date_range(dtm1, dtm2):
-        tile.all(dtm)
-    if settings.get("remote_sync") and settings.get("tiles_updated") and sync:
+    dtm2 = date.today()
+    dtm1 = dtm2 - timedelta(days=days)
+    dates = [dtm1 + timedelta(days=i) for i in range(days + 1)]
+    tile.prefetch(dtm1, dtm2)
+    day_workers = min(len(dates), int(settings.get("day_workers")
+                                      or max(1, (os.cpu_count() or 1) // len(tile.PRODUCTS))))
+    tile_workers = max(1, int(tile._tile_workers()) // day_workers)
+    with tile._process_pool(day_workers) as executor:
+        updated = list(executor.map(_render_one_day, dates,
+                                    [tile_workers] * len(dates)))
+    if any(updated):
+        settings.set("tiles_updated", True)
+    if _sync_due(sync):
         tile.sync()
         layer_config.sync()
         settings.set("tiles_updated", False)
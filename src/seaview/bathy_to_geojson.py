@@ -1,6 +1,7 @@
 import matplotlib.pyplot as plt
 import numpy as np
-import json
+
+from seaview.utils import json_dumps
 
 # Create sample data
 x = np.linspace(-3, 3, 100)
@@ -39,13 +40,13 @@ for level_idx, level in enumerate(contours.levels):
             },
             "geometry": {
                 "type": "LineString",
-                "coordinates": segment.tolist()
+                "coordinates": segment
             }
         }
         geojson["features"].append(feature)
 
 # Save to file
-with open('contours.geojson', 'w') as f:
-    json.dump(geojson, f, indent=2)
+with open('contours.geojson', 'wb') as f:
+    f.write(json_dumps(geojson))
 
 print(f"Saved {len(geojson['features'])} contour lines to contours.geojson")
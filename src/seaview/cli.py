@@ -3,9 +3,11 @@
 This module provides CLI commands for generating and managing oceanographic
 map tiles using the Typer framework.
 """
-import typer
+from datetime import date, timedelta
 from typing import Annotated
 
+import typer
+
 
 import seaview
 
@@ -23,8 +25,15 @@ def update(
         seaview.config.change_env(env)
         typer.echo(f"Using environment: {env}")
     print(seaview.settings["cruise_name"])
-    seaview.today(force=False, sync=sync)
-    seaview.yesterday(force=True, sync=sync)
+    seaview.tile.prefetch(date.today() - timedelta(days=1), date.today())
+    with seaview.deferred_sync():
+        seaview.today(force=False, sync=sync)
+        seaview.yesterday(force=True, sync=sync)
+    try:
+        seaview.utils.wait_for_background()
+    except RuntimeError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(code=1)
 
 
 @app.callback()
@@ -33,6 +42,7 @@ def callback():
 
     Currently SST, SSH, and Chl from Copernicus are available.
     """
+    seaview.config.config_log()
 
 
 
@@ -19,10 +19,14 @@ GLOB_DIR : pathlib.Path
     Path to global configuration directory.
 CURR_DIR : pathlib.Path
     Path to current working directory.
-settings : Dynaconf
-    The Dynaconf settings object with loaded configuration.
+settings : _LazySettings
+    Stand-in for the Dynaconf settings object. Modules bind it at import
+    time with ``settings = config.settings``, and the Dynaconf object is
+    only constructed when a setting is first read. Use
+    :func:`get_settings` for the Dynaconf object itself.
 """
 import os
+import re
 import pathlib
 import logging
 #import auxiliary_module
@@ -45,40 +49,170 @@ extra_file = os.getenv("SEAVIEW_SETTINGS_FILE_FOR_DYNACONF")
 if extra_file:
     settings_files.append(pathlib.Path(extra_file).absolute())
 
-settings = Dynaconf(
-    merge_enabled = False,
-    envvar_prefix="SEAVIEW",
-    DEBUG_LEVEL_FOR_DYNACONF='DEBUG',
-    settings_files=settings_files,
-    #secrets=[
-    #    "/etc/seaview/.secrets.toml",
-    #    "~/.config/seaview/.secrets.toml",
-    #    "./.seaview.toml",
-    #],
-    environments=True,
-    load_dotenv=True,
-)
+
+def _existing_settings_files():
+    """Return the candidate settings files that exist on disk.
+
+    Dynaconf tries to import every listed file, which is slow for files
+    that do not exist, so missing ones are dropped before construction.
+    """
+    return [fn for fn in settings_files if fn.exists()]
+
+
+def _uses_environments(files):
+    """Check whether the settings are organised in environments.
+
+    Environment handling adds a merge pass per environment to the
+    Dynaconf setup, so it is only enabled when an environment is selected
+    with ``SEAVIEW_ENV`` or ``ENV_FOR_DYNACONF``, or when a settings file
+    has a ``[default]``, ``[development]``, or ``[production]`` table.
+    Files with only custom environments, such as ``[OMI]``, are switched
+    to with :func:`change_env`, which enables environments when needed.
+
+    Parameters
+    ----------
+    files : list of pathlib.Path
+        Settings files to check.
+
+    Returns
+    -------
+    bool
+        True if environments should be enabled.
+    """
+    if os.getenv("SEAVIEW_ENV") or os.getenv("ENV_FOR_DYNACONF"):
+        return True
+    header = re.compile(r"^\s*\[(default|development|production)[.\]]",
+                        re.IGNORECASE | re.MULTILINE)
+    return any(header.search(fn.read_text()) for fn in files
+               if fn.suffix == ".toml")
+
+
+def _build_settings(environments=None):
+    """Construct the Dynaconf settings object.
+
+    Parameters
+    ----------
+    environments : bool, optional
+        Enable Dynaconf environments, by default detected from the
+        settings files.
+
+    Returns
+    -------
+    Dynaconf
+        Settings object built from the existing settings files.
+    """
+    files = _existing_settings_files()
+    if environments is None:
+        environments = _uses_environments(files)
+    return Dynaconf(
+        merge_enabled = False,
+        envvar_prefix="SEAVIEW",
+        DEBUG_LEVEL_FOR_DYNACONF='DEBUG',
+        settings_files=files,
+        #secrets=[
+        #    "/etc/seaview/.secrets.toml",
+        #    "~/.config/seaview/.secrets.toml",
+        #    "./.seaview.toml",
+        #],
+        environments=environments,
+        load_dotenv=True,
+    )
+
+
+_settings = None
+
+
+def get_settings():
+    """Return the Dynaconf settings object, building it on first use.
+
+    Returns
+    -------
+    Dynaconf
+        The settings object shared by all seaview modules.
+    """
+    global _settings
+    if _settings is None:
+        _settings = _build_settings()
+    return _settings
+
+
+class _LazySettings:
+    """Forward to the settings object of :func:`get_settings`.
+
+    Binding this at import time costs nothing, the settings files are only
+    read when a setting is first accessed.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+    def __getitem__(self, key):
+        return get_settings()[key]
+
+    def __contains__(self, key):
+        return key in get_settings()
+
+    def __iter__(self):
+        return iter(get_settings())
+
+    def __repr__(self):
+        if _settings is None:
+            return "<LazySettings (not loaded)>"
+        return repr(_settings)
+
+
+settings = _LazySettings()
+
+
+# Flags set while running rather than read from the settings files. They
+# are kept across environment switches and not copied to worker processes.
+_RUNTIME_KEYS = ("TILES_UPDATED",)
+
 
 def change_env(new_env):
     """Change the active Dynaconf environment.
 
+    Switching the environment already re-runs the settings loaders, so no
+    separate reload is needed. Settings built without environments are
+    rebuilt with them first. Runtime flags such as ``tiles_updated``
+    keep their current value.
+
     Parameters
     ----------
     new_env : str
         The environment name to switch to (e.g., 'development', 'production').
     """
+    global _settings
+    settings = get_settings()
+    runtime = {name: settings.get(name) for name in _RUNTIME_KEYS
+               if settings.get(name) is not None}
+    if not settings.get("ENVIRONMENTS_FOR_DYNACONF"):
+        # Built without environments, the environment tables were read as
+        # plain settings
+        _settings = settings = _build_settings(environments=True)
     settings.setenv(new_env)
-    settings.reload()
+    for name, value in runtime.items():
+        settings.set(name, value)
 
 
 #print("Loaded files:", settings.loaded_files)
 #print("\nSettings:", dict(settings))
 
 def config_log():
+    """Configure logging for seaview.
+
+    The level is taken from the ``log_level`` setting (default "INFO"),
+    and is lowered to DEBUG when ``verbose`` is set so that progress
+    messages from :func:`seaview.utils.vprint` are shown. The ``verbose``
+    arguments of the tile functions change the level in the same way,
+    see :func:`seaview.utils.set_verbose`.
+    """
     logpath = pathlib.Path.home() / ".local/state/seaview/"
     logpath.mkdir(parents=True, exist_ok=True)
-    logger = logging.getLogger("seaview")
-    logging.basicConfig(format='%(levelname)s:%(message)s', level=logging.DEBUG)
+    settings = get_settings()
+    level = "DEBUG" if settings.get("verbose") else settings.get("log_level", "INFO")
+    logging.basicConfig(format='%(levelname)s:%(message)s')
+    logging.getLogger("seaview").setLevel(str(level).upper())
 
     logging.getLogger('copernicusmarine').setLevel("WARNING")
     logging.getLogger('copernicusmarine').handlers.clear()
@@ -0,0 +1,306 @@
+"""Shared access to daily Copernicus Marine Service products.
+
+This module provides the :class:`CopernicusSource` class used by the
+SSH, OSTIA, and GlobColour data source modules. Each of those modules
+creates one instance describing its product and exposes the instance
+methods as module level functions.
+"""
+import functools
+import pathlib
+import time
+
+import numpy as np
+import xarray as xr
+import copernicusmarine
+
+from ..utils import vprint, DataObjectError
+from .utils import day_bounds, iso_day, missing_dates, split_days
+from .. import config
+settings = config.settings
+
+
+def _mask_and_scale(da):
+    """Apply the CF encoding attributes of a variable.
+
+    Handles ``_Unsigned``, ``_FillValue``, ``missing_value``,
+    ``scale_factor``, and ``add_offset`` the same way as xarray's CF
+    decoding.
+
+    Parameters
+    ----------
+    da : xarray.DataArray
+        Variable opened with ``decode_cf=False``.
+
+    Returns
+    -------
+    xarray.DataArray
+        float32 values with missing data as NaN.
+    """
+    attrs = dict(da.attrs)
+    unsigned = str(attrs.pop("_Unsigned", "")).lower()
+    missing = [value for name in ("_FillValue", "missing_value")
+               for value in np.atleast_1d(attrs.pop(name, []))]
+    scale = attrs.pop("scale_factor", 1)
+    offset = attrs.pop("add_offset", 0)
+    if da.dtype.kind in "iu" and unsigned in ("true", "false"):
+        # Reinterpret the stored integers, fill values included
+        dtype = np.dtype(f"{'u' if unsigned == 'true' else 'i'}{da.dtype.itemsize}")
+        missing = [np.asarray(value, dtype=da.dtype).view(dtype) for value in missing]
+        da = da.copy(data=da.data.view(dtype))
+    values = da.astype(np.float32)
+    if missing:
+        values = values.where(~da.isin(missing))
+    if scale != 1 or offset != 0:
+        values = values * np.float32(scale) + np.float32(offset)
+    return values.assign_attrs(attrs)
+
+
+class CopernicusSource:
+    """A daily gridded product from the Copernicus Marine Service.
+
+    Parameters
+    ----------
+    dataset_id : str
+        Copernicus Marine dataset identifier.
+    name : str
+        Product name used in the data filenames.
+    subdir : str
+        Subdirectory of ``settings.data_dir`` holding the data files.
+    data_var : str
+        Variable checked for empty downloads.
+    title : str
+        Human readable collection name used in progress messages.
+    """
+
+    OPEN_ATTEMPTS = 4
+
+    def __init__(self, dataset_id, name, subdir, data_var, title):
+        self.dataset_id = dataset_id
+        self.name = name
+        self.subdir = subdir
+        self.data_var = data_var
+        self.title = title
+
+    def datadir(self, dtm=None):
+        """Return the directory holding the data files.
+
+        The directory is created when data is first downloaded, not here.
+
+        Parameters
+        ----------
+        dtm : str or datetime-like, optional
+            Unused parameter for API compatibility.
+
+        Returns
+        -------
+        pathlib.Path
+            Path to the data directory.
+        """
+        return pathlib.Path(settings.data_dir) / self.subdir
+
+    @functools.lru_cache(maxsize=256)
+    def filename(self, dtm="2025-06-03"):
+        """Generate filename for a daily data file.
+
+        Parameters
+        ----------
+        dtm : str or datetime-like, optional
+            The date for the filename, by default "2025-06-03".
+
+        Returns
+        -------
+        str
+            Filename in format 'copernicus_<NAME>_YYYY-MM-DD.nc'.
+        """
+        return f"copernicus_{self.name}_{iso_day(dtm)}.nc"
+
+    def open_dataset(self, dtm="2025-06-03", force=False):
+        """Open the dataset for a given date.
+
+        Downloads the data if not already cached locally. With the
+        ``stream_data`` setting enabled, data that is not cached is instead
+        opened lazily from the remote dataset, falling back to a download
+        if that fails.
+
+        Parameters
+        ----------
+        dtm : str or datetime-like, optional
+            The date to retrieve, by default "2025-06-03".
+        force : bool, optional
+            Force download even if file exists, by default False.
+
+        Returns
+        -------
+        xarray.Dataset
+            Dataset with the product variables. Only the data variable is
+            CF decoded, the other variables hold their raw values.
+        """
+        fn = self.datadir() / self.filename(dtm=dtm)
+        vprint(f"{self.name} Data file: {fn}")
+        if settings.get("stream_data") and (force or not fn.is_file()):
+            try:
+                return self.open_remote(dtm=dtm)
+            except Exception as e:
+                vprint(f"Could not stream {self.dataset_id}, downloading: {e}")
+        if force or not fn.is_file():
+            self.retrieve(dtm=dtm, force=force)
+        for attempt in range(self.OPEN_ATTEMPTS):
+            if attempt > 0:
+                vprint("Failed to open the file, will try again")
+                time.sleep(5)
+            try:
+                # Skip CF decoding of every variable, only the data
+                # variable is used and it is decoded below.
+                ds = xr.open_dataset(fn, engine="h5netcdf", chunks={}, cache=True,
+                                     decode_cf=False, mask_and_scale=False)
+                break
+            except OSError:
+                pass
+        else:
+            raise OSError(f"Failed to open {fn} after {self.OPEN_ATTEMPTS} attempts.")
+        # Read the data variable once, the emptiness check and the tiling
+        # then share the values in memory
+        ds[self.data_var] = _mask_and_scale(ds[self.data_var]).load()
+        if np.nansum(ds[self.data_var]) == 0:
+            fn.unlink()
+            raise DataObjectError(f"The {self.data_var} data variable in {fn}" +
+                                  " is empty, file deleted.")
+        return ds
+
+    def open_remote(self, dtm="2025-06-03"):
+        """Open one day of the remote dataset lazily.
+
+        Only the configured area and the data variable are read, chunk by
+        chunk as they are used, instead of first downloading the daily
+        subset to a file.
+
+        Parameters
+        ----------
+        dtm : str or datetime-like, optional
+            The date to open, by default "2025-06-03".
+
+        Returns
+        -------
+        xarray.Dataset
+            Dask backed dataset with the data variable.
+        """
+        return self.open_multiday(dtm, dtm)
+
+    def open_multiday(self, dtm1, dtm2):
+        """Open a range of days of the remote dataset lazily.
+
+        The range is opened with a single request, so slicing several days
+        out of it with ``ds.sel(time=...)`` shares one session instead of
+        opening the remote dataset once per day.
+
+        Parameters
+        ----------
+        dtm1 : str or datetime-like
+            First date of the range.
+        dtm2 : str or datetime-like
+            Last date of the range, inclusive.
+
+        Returns
+        -------
+        xarray.Dataset
+            Dask backed dataset with the data variable, one chunk per day.
+        """
+        dtstart = day_bounds(iso_day(dtm1))[0]
+        dtend = day_bounds(iso_day(dtm2))[1]
+        ds = copernicusmarine.open_dataset(
+            dataset_id=self.dataset_id,
+            username=settings.get("cmems_login"),
+            password=settings.get("cmems_password"),
+            variables=[self.data_var],
+            minimum_longitude=settings["lon1"],
+            maximum_longitude=settings["lon2"],
+            minimum_latitude=settings["lat1"],
+            maximum_latitude=settings["lat2"],
+            start_datetime=dtstart,
+            end_datetime=dtend,
+        )
+        chunks = dict(time=1, latitude=512, longitude=512)
+        return ds.chunk({dim: size for dim, size in chunks.items() if dim in ds.dims})
+
+    def retrieve(self, dtm="2025-06-03", force=False, parallel=True):
+        """Retrieve data for one day from Copernicus Marine Service.
+
+        Parameters
+        ----------
+        dtm : str or datetime-like, optional
+            The date to retrieve, by default "2025-06-03".
+        force : bool, optional
+            Force download even if file exists, by default False.
+        parallel : bool, optional
+            Use parallel download (unused), by default True.
+        """
+        fn = self.datadir() / self.filename(dtm)
+        if fn.is_file() and not force:
+            return
+        elif force:
+            fn.unlink(missing_ok=True)
+        day = iso_day(dtm)
+        vprint(f"Date: {day} \nCollection: {self.title}")
+        dtstart, dtend = day_bounds(day)
+        self._subset(dtstart, dtend, fn)
+
+    def retrieve_range(self, dtm1, dtm2, force=False):
+        """Retrieve data for a range of dates in a single request.
+
+        All dates in the range without a local file are downloaded with one
+        ``copernicusmarine.subset`` call, and the result is split into the
+        same daily files that :meth:`retrieve` produces. The request is
+        clipped to the time coverage of the dataset, so dates not yet
+        available, such as today for the NRT products, are left out
+        instead of failing the whole range. Only the missing days that the
+        dataset returns are written, existing files are not touched.
+
+        Parameters
+        ----------
+        dtm1 : str or datetime-like
+            First date of the range.
+        dtm2 : str or datetime-like
+            Last date of the range, inclusive.
+        force : bool, optional
+            Force download even if files exist, by default False.
+        """
+        dates = missing_dates(dtm1, dtm2, self.datadir(), self.filename, force=force)
+        if len(dates) == 0:
+            return
+        vprint(f"Dates: {dates[0].date()} - {dates[-1].date()} \nCollection: {self.title}")
+        dtstart = day_bounds(dates[0].date().isoformat())[0]
+        dtend = day_bounds(dates[-1].date().isoformat())[1]
+        bulk_fn = self.datadir() / (
+            f"copernicus_{self.name}_{dates[0].date()}_{dates[-1].date()}.nc")
+        self._subset(dtstart, dtend, bulk_fn, coordinates_selection_method="inside")
+        split_days(bulk_fn, self.datadir(), self.filename, dates)
+
+    def _subset(self, dtstart, dtend, fn, **options):
+        """Download the configured area between two times to a file.
+
+        Parameters
+        ----------
+        dtstart : datetime.datetime
+            Start of the time domain.
+        dtend : datetime.datetime
+            End of the time domain.
+        fn : pathlib.Path
+            Output file.
+        **options
+            Further keyword arguments of ``copernicusmarine.subset``.
+        """
+        fn.parent.mkdir(parents=True, exist_ok=True)
+        copernicusmarine.subset(
+            dataset_id=self.dataset_id,
+            username = settings.get("cmems_login"),
+            password = settings.get("cmems_password"),
+            minimum_longitude=settings["lon1"],
+            maximum_longitude=settings["lon2"],
+            minimum_latitude=settings["lat1"],
+            maximum_latitude=settings["lat2"],
+            start_datetime=dtstart,
+            end_datetime=dtend,
+            output_filename = fn.name,
+            output_directory = fn.parent,
+            **options
+        )
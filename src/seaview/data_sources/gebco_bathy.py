@@ -16,6 +16,7 @@ import xarray as xr
 import copernicusmarine
 
 from ..area_definitions import rectlinear as rectlin_area
+from ..utils import vprint
 from .. import config
 settings = config.settings
 
@@ -26,21 +27,6 @@ def datadir(dtm=None):
     return path
 
 
-VERBOSE = True
-
-
-def vprint(text):
-    """Print text if verbose mode is enabled.
-
-    Parameters
-    ----------
-    text : str
-        Text to print.
-    """
-    if VERBOSE:
-        print(text)
-
-
 def filename(dtm=None):
     """Generate filename for GEBCO bathymetry data file.
 
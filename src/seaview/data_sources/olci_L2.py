@@ -26,6 +26,7 @@ import xarray as xr
 from eumdac.errors import Text
 import sqlite3
 
+from ..utils import vprint
 from .. import config
 settings = config.settings
 
@@ -39,21 +40,6 @@ DBFILE = DATADIR / "swaths.sqlite"
 
 MAX_PARALLEL_CONNS = 10
 
-VERBOSE = True
-
-
-def vprint(text):
-    """Print text if verbose mode is enabled.
-
-    Parameters
-    ----------
-    text : str
-        Text to print.
-    """
-    if VERBOSE:
-        print(text)
-
-
 def bbox_polygon(lat1=None, lat2=None, lon1=None, lon2=None):
     """Create a WKT polygon string for bounding box queries.
 
@@ -9,79 +9,24 @@ References
 DOI: https://doi.org/10.48670/moi-00165
 Product: https://data.marine.copernicus.eu/product/SST_GLO_SST_L4_NRT_OBSERVATIONS_010_001/description
 """
-import pathlib
-from concurrent.futures import ThreadPoolExecutor
-import copernicusmarine
-import time
-
-import numpy as np
-import pandas as pd
 import satpy
-import xarray as xr
-import copernicusmarine
-
-from ..utils import vprint, DataObjectError
-from seaview.area_definitions import rectlinear as rectlin_area
-from seaview import config
-settings = config.settings
-
-
-def datadir(dtm=None):
-    path = pathlib.Path(settings.data_dir) / "copernicus/OSTIA"
-    path.mkdir(parents=True, exist_ok=True)
-    return path
-
-def filename(dtm="2025-06-03"):
-    """Generate filename for OSTIA data file.
-
-    Parameters
-    ----------
-    dtm : str or datetime-like, optional
-        The date for the filename, by default "2025-06-03".
 
-    Returns
-    -------
-    str
-        Filename in format 'copernicus_OSTIA_YYYY-MM-DD.nc'.
-    """
-    dtm = pd.to_datetime(dtm)
-    return f"copernicus_OSTIA_{dtm.date()}.nc"
-
-
-def open_dataset(dtm="2025-06-03", _pause=0, _retry=0, force=False):
-    """Open OSTIA SST dataset for a given date.
-
-    Downloads the data if not already cached locally.
-
-    Parameters
-    ----------
-    dtm : str or datetime-like, optional
-        The date to retrieve, by default "2025-06-03".
-    force : bool, optional
-        Force download even if file exists, by default False.
+from ..utils import vprint
+from .copernicus import CopernicusSource
 
-    Returns
-    -------
-    xarray.Dataset
-        Dataset containing SST variables.
-    """
-    fn = datadir() / filename(dtm=dtm)
-    if force or not fn.is_file():
-        retrieve(dtm=dtm, force=force)
-    if _retry > 3:
-        raise OSError(f"Failed to open {fn} after {_retry} attempts.")
-    if _retry > 0:
-        vprint("Failed to open the file, will try again")
-    time.sleep(_pause)
-    try:
-        ds = xr.open_dataset(fn, engine="h5netcdf")
-    except (OSError,):
-        ds = open_dataset(dtm=dtm, _pause=5, _retry=_retry+1)
-    if np.nansum(ds.analysed_sst) == 0:
-        fn.unlink()
-        raise DataObjectError(f"The CHL data variable in {fn}" +
-                                  " is empty, file deleted.")
-    return ds
+source = CopernicusSource(
+    dataset_id="METOFFICE-GLO-SST-L4-NRT-OBS-SST-V2",
+    name="OSTIA",
+    subdir="copernicus/OSTIA",
+    data_var="analysed_sst",
+    title="Sea Surface Temperature",
+)
+datadir = source.datadir
+filename = source.filename
+open_dataset = source.open_dataset
+open_multiday = source.open_multiday
+retrieve = source.retrieve
+retrieve_range = source.retrieve_range
 
 
 def open_scene(dtm="2025-06-03", data_var="sla"):
@@ -106,47 +51,3 @@ def open_scene(dtm="2025-06-03", data_var="sla"):
     scn = satpy.Scene(filenames=[fn], reader='copernicus_ssh')
     scn.load(['adt', 'sla', 'ugos', 'vgos'])
     return scn
-
-
-def retrieve(dtm="2025-06-03", force=False, parallel=True):
-    """Retrieve OSTIA SST data from Copernicus Marine Service.
-
-    Parameters
-    ----------
-    dtm : str or datetime-like, optional
-        The date to retrieve, by default "2025-06-03".
-    force : bool, optional
-        Force download even if file exists, by default False.
-    parallel : bool, optional
-        Use parallel download (unused), by default True.
-    """
-    if ((datadir() / filename(dtm)).is_file() and not force):
-        return
-    elif force:
-        (datadir() / filename(dtm)).unlink(missing_ok=True)
-    dtm = pd.to_datetime(dtm, utc=True)
-    vprint(f"Date: {dtm.date()} \nCollection: Sea Surface Temperature")
-
-    # Define the time and space domains
-    dtstart = dtm.normalize().to_pydatetime()
-    dtend = (
-        dtm.normalize() + pd.Timedelta(1, "d") - pd.Timedelta(1, "s")
-    ).to_pydatetime()
-
-    copernicusmarine.subset(
-        #dataset_id="cmems_mod_glo_phy_my_0.083deg_P1D-m",
-        dataset_id="METOFFICE-GLO-SST-L4-NRT-OBS-SST-V2",
-        username = settings.get("cmems_login"),
-        password = settings.get("cmems_password"),
-        #variables=["uo", "vo"],
-        minimum_longitude=settings["lon1"],
-        maximum_longitude=settings["lon2"],
-        minimum_latitude=settings["lat1"],
-        maximum_latitude=settings["lat2"],
-        start_datetime=dtstart,
-        end_datetime=dtend,
-        #minimum_depth=0,
-        #maximum_depth=30,
-        output_filename = filename(dtm),
-        output_directory = datadir()
-    )
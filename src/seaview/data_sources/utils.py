@@ -0,0 +1,92 @@
+"""Helper functions shared by the data source modules.
+
+This module provides utilities used by several of the Copernicus data
+source modules, such as splitting multi-day downloads into daily files.
+"""
+import datetime
+import functools
+import os
+
+import pandas as pd
+import xarray as xr
+
+from ..utils import iso_day
+
+
+@functools.lru_cache(maxsize=512)
+def day_bounds(day):
+    """Return the first and last second of a day in UTC.
+
+    Parameters
+    ----------
+    day : str
+        The day as an ISO date string (YYYY-MM-DD).
+
+    Returns
+    -------
+    tuple of datetime.datetime
+        Start and end of the day.
+    """
+    start = datetime.datetime.fromisoformat(day).replace(tzinfo=datetime.timezone.utc)
+    return start, start + datetime.timedelta(days=1, seconds=-1)
+
+
+def missing_dates(dtm1, dtm2, datadir, filename, force=False):
+    """Find the dates in a range that have no local data file.
+
+    Parameters
+    ----------
+    dtm1 : str or datetime-like
+        First date of the range.
+    dtm2 : str or datetime-like
+        Last date of the range, inclusive.
+    datadir : pathlib.Path
+        Directory holding the daily data files.
+    filename : callable
+        Function returning the daily filename for a date.
+    force : bool, optional
+        Treat all dates as missing, by default False.
+
+    Returns
+    -------
+    pandas.DatetimeIndex
+        Dates without a local data file.
+    """
+    dates = pd.date_range(pd.to_datetime(dtm1).normalize(),
+                          pd.to_datetime(dtm2).normalize())
+    if force:
+        return dates
+    return dates[[not (datadir / filename(dtm)).is_file() for dtm in dates]]
+
+
+def split_days(bulk_fn, datadir, filename, dates):
+    """Split a multi-day NetCDF file into one file per day.
+
+    The time dimension is kept with length one so that the daily files
+    look the same as files downloaded for a single day. Only the days in
+    ``dates`` are written, so existing daily files inside the range are
+    left untouched. Each file is written to a temporary name and renamed
+    into place, so an interrupted split never leaves a partial file. The
+    multi-day file is deleted afterwards.
+
+    Parameters
+    ----------
+    bulk_fn : pathlib.Path
+        Path to the multi-day NetCDF file.
+    datadir : pathlib.Path
+        Directory where the daily files are written.
+    filename : callable
+        Function returning the daily filename for a date.
+    dates : pandas.DatetimeIndex
+        Dates to write, usually the ones returned by :func:`missing_dates`.
+    """
+    wanted = set(pd.DatetimeIndex(dates).normalize())
+    with xr.open_dataset(bulk_fn, engine="h5netcdf") as ds:
+        for i, dtm in enumerate(pd.to_datetime(ds.time.values)):
+            if dtm.normalize() not in wanted:
+                continue
+            fn = datadir / filename(dtm)
+            tmp_fn = fn.with_name(f"{fn.name}.{os.getpid()}.tmp")
+            ds.isel(time=slice(i, i + 1)).to_netcdf(tmp_fn)
+            os.replace(tmp_fn, fn)
+    bulk_fn.unlink()
@@ -4,56 +4,149 @@ This module provides functions to generate, update, and synchronize
 JSON configuration files that define map layer settings for the
 tile server web interface.
 """
-import json
+import copy
+import datetime
+import os
 import pathlib
+import shutil
+import tempfile
 
-import pandas as pd
-import sysrsync
-from jinja2 import Template
-
-from .utils import vprint
+from .utils import vprint, find_ssh_key, rsync_rsh, json_loads, json_dumps
 from . import config
 settings = config.settings
-from .utils import vprint
+
+# Static part of the layer configuration, the colour scale of each layer
+# and the base url are filled in from the settings by generate_config().
+_LAYER_TEMPLATE = {
+    "base_url": None,
+    "layers": [
+        {
+            "id": "ssh",
+            "name": "SSH CMEMS 0.125°  ",
+            "url_template": "{base_url}/ssh/{date}/{z}/{x}/{y}.png",
+            "attribution": "Copernicus 1/125° SSH -0.75–0.75 m",
+        },
+        {
+            "id": "ostia",
+            "name": "SST OSTIA 5km     ",
+            "url_template": "{base_url}/ostia/{date}/{z}/{x}/{y}.png",
+            "attribution": "OSTIA 2km SST 10–28°C",
+        },
+        {
+            "id": "globcolour",
+            "name": "Chl GlobColour 4km",
+            "url_template": "{base_url}/globcolour/{date}/{z}/{x}/{y}.png",
+            "attribution": "Globcolour 4km Chl 0.01-100 mg/m3",
+        },
+    ],
+}
+
+# First and last tile date of each layer directory, keyed by the path and
+# mtime of the directory. The mtime changes when a date is added or removed.
+_DATES_CACHE = pathlib.Path(tempfile.gettempdir()) / "seaview_layer_dates.json"
+
+_COMMON_SETTINGS = {
+    "date_range": {
+        "start": "2026-01-08",
+        "end": "2026-01-14"
+    },
+    "exclusive": False,
+    "collapsed": False
+}
 
 def sync():
     """Generate and sync layer configuration to remote server.
 
-    Generates a new layer configuration file, updates it with current
-    tile date ranges, and syncs to the remote server via rsync.
+    Builds the layer configuration in memory, sets the current tile date
+    ranges, writes it once, and syncs it to the remote server via rsync. The file
+    is staged both at the top level and in ``devel/``, and both copies are
+    uploaded by a single rsync call, and a single SSH connection. Only the
+    two files are listed for transfer, so the permissions and mtime of the
+    remote html directory itself are left alone.
     """
+    import sysrsync
     print("Sync layer_config file")
-    tmp_dir = pathlib.Path("/tmp")
-    generate_file(json_file_path=tmp_dir)
-    update(json_file_path=tmp_dir)
-    key = pathlib.Path.cwd() / "sea_id_ed25519"
-    if not key.is_file():
-        key  = pathlib.Path.home() / ".ssh/sea_id_ed25519"
-    if not key.is_file():
-        key  = pathlib.Path.home() / ".config/seaview/sea_id_ed25519"
-    if not key.is_file():
-        print("Can't find an ssh key file, will use the default.")
-        key = None
-    payload = dict(source=str(tmp_dir / "layer_config.json"),
-                 destination=settings.get("remote_html_dir"),
-                 destination_ssh=settings.get("remote_server"),
-                 options=['-a'],
-                 private_key=key,
-                 strict=True,)
-    sysrsync.run(**payload)
-    payload["destination"] = payload["destination"] + "/devel/"
-    sysrsync.run(**payload)
+    key = find_ssh_key()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        stage_dir = pathlib.Path(tmp_dir)
+        data = generate_config()
+        set_date_ranges(data, find_first_last_tile_dates())
+        write_config(data, stage_dir / "layer_config.json")
+        (stage_dir / "devel").mkdir()
+        shutil.copy2(stage_dir / "layer_config.json", stage_dir / "devel")
+        files = stage_dir / "files.txt"
+        files.write_text("layer_config.json\ndevel/layer_config.json\n")
+        sysrsync.run(source=str(stage_dir),
+                     destination=settings.get("remote_html_dir"),
+                     destination_ssh=settings.get("remote_server"),
+                     # The staged file is always new, so compare contents
+                     options=['-tz', '--compress-level=1', '--checksum',
+                              f'--files-from={files}', *rsync_rsh(key)],
+                     sync_source_contents=True,
+                     strict=True)
 
 
     #dtm = pd.Timestamp.now().isoformat().split(".")[0]
 
 
+def _tile_date_names(layer_dir):
+    """Return the names of the date directories of a tile layer.
+
+    Parameters
+    ----------
+    layer_dir : pathlib.Path
+        Tile directory of one layer.
+
+    Returns
+    -------
+    list of str
+        Directory names (YYYY-MM-DD), empty if the layer has no tiles.
+    """
+    try:
+        with os.scandir(layer_dir) as entries:
+            return [entry.name for entry in entries if entry.is_dir()]
+    except FileNotFoundError:
+        return []
+
+
+def _first_last_names(layer_dir, cache):
+    """Return the first and last date directory names of a tile layer.
+
+    Parameters
+    ----------
+    layer_dir : pathlib.Path
+        Tile directory of one layer.
+    cache : dict
+        Results of earlier scans, updated in place.
+
+    Returns
+    -------
+    tuple of str or None
+        First and last name, or None if the layer has no tiles.
+    """
+    try:
+        mtime = os.stat(layer_dir).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = cache.get(str(layer_dir))
+    if cached and cached["mtime"] == mtime:
+        return cached["first"], cached["last"]
+    names = _tile_date_names(layer_dir)
+    if not names:
+        return None
+    # Tile dirs are named YYYY-MM-DD, so string order is date order
+    first, last = min(names), max(names)
+    cache[str(layer_dir)] = dict(mtime=mtime, first=first, last=last)
+    return first, last
+
+
 def find_first_last_tile_dates():
     """Find the date range of available tiles for each layer.
 
     Scans the tile directory to determine the earliest and latest
     available tile dates for each layer, respecting the maximum
-    tile days setting.
+    tile days setting. Layers without any tiles are left out. A layer
+    directory is only scanned again when its mtime has changed.
 
     Returns
     -------
@@ -63,16 +156,25 @@ def find_first_last_tile_dates():
     """
     tilepath = pathlib.Path(settings["tile_dir"])
     vprint(tilepath)
+    try:
+        cache = json_loads(_DATES_CACHE.read_bytes())
+    except (OSError, ValueError):
+        cache = {}
+    cache_before = dict(cache)
     layer_dates = dict()
     for layer_name in settings.get("updated_tiles"):
-        layer = tilepath / layer_name
-        vprint(layer, level=1)
-        date_range = pd.to_datetime([d.name for d in layer.glob("*")])
-        vprint(date_range, level=1)
-        dtm1 = date_range.min()
-        dtm2 = date_range.max()
-        ddtm = pd.Timedelta(min((dtm2-dtm1).days, settings.get("max_tile_days")-1), "D")
-        layer_dates[layer.name] = dict(start=(dtm2 - ddtm).date(), end=dtm2.date())
+        first_last = _first_last_names(tilepath / layer_name, cache)
+        if first_last is None:
+            vprint(lambda: f"{layer_name}: no tiles found")
+            continue
+        first, last = first_last
+        vprint(lambda: f"{layer_name}: {first} - {last}", level=1)
+        dtm1 = datetime.date.fromisoformat(first)
+        dtm2 = datetime.date.fromisoformat(last)
+        ddtm = datetime.timedelta(min((dtm2-dtm1).days, settings.get("max_tile_days")-1))
+        layer_dates[layer_name] = dict(start=dtm2 - ddtm, end=dtm2)
+    if cache != cache_before:
+        write_config(cache, _DATES_CACHE)
     return layer_dates
 
 
@@ -120,37 +222,117 @@ def update_date_ranges(json_file, layer_dates=None, output_file=None):
     >>> update_date_ranges('data.json', layer_dates=layer_dates)
     """
 
-    # Read the JSON file
-    with open(json_file, 'r') as f:
-        data = json.load(f)
-
-    # Update each layer's date_range based on layer_dates
-    if layer_dates:
-        for layer in data.get('layers', []):
-            layer_id = layer.get('id')
-
-            # Check if this layer has updates
-            if layer_id in layer_dates and 'date_range' in layer:
-                vprint(layer_id)
-                updates = layer_dates[layer_id]
-
-                # Update start date if provided
-                if 'start' in updates:
-                    start_date = pd.Timestamp(updates['start'])
-                    vprint(start_date)
-                    layer['date_range']['start'] = start_date.strftime('%Y-%m-%d')
-
-                # Update end date if provided
-                if 'end' in updates:
-                    end_date = pd.Timestamp(updates['end'])
-                    vprint(end_date)
-                    layer['date_range']['end'] = end_date.strftime('%Y-%m-%d')
-
-    # Save the updated JSON
-    output_path = output_file or json_file
+    json_file = pathlib.Path(json_file)
+    raw = json_file.read_bytes()
+    data = json_loads(raw)
+    set_date_ranges(data, layer_dates)
+
+    output_path = pathlib.Path(output_file or json_file)
     vprint(output_path)
-    with open(output_path, 'w') as f:
-        json.dump(data, f, indent=2)
+    if output_file is None and write_config(data) == raw:
+        vprint("Layer dates unchanged, skip writing")
+        return
+    write_config(data, output_path)
+
+
+def _iso(dtm):
+    """Return a date as a YYYY-MM-DD string.
+
+    Dates and datetimes, as returned by :func:`find_first_last_tile_dates`,
+    are formatted directly; other values are parsed with pandas.
+    """
+    if isinstance(dtm, datetime.datetime):
+        return dtm.date().isoformat()
+    if isinstance(dtm, datetime.date):
+        return dtm.isoformat()
+    import pandas as pd
+    return pd.Timestamp(dtm).strftime('%Y-%m-%d')
+
+
+def set_date_ranges(data, layer_dates=None):
+    """Set the start and end dates of the layers in a configuration dict.
+
+    Parameters
+    ----------
+    data : dict
+        Layer configuration as returned by :func:`generate_config`,
+        updated in place.
+    layer_dates : dict, optional
+        Dictionary mapping layer IDs to their new date ranges.
+        Format: {'layer_id': {'start': date, 'end': date}}.
+    """
+    if not layer_dates:
+        return
+    for layer in data.get('layers', []):
+        layer_id = layer.get('id')
+        if layer_id in layer_dates and 'date_range' in layer:
+            vprint(layer_id)
+            updates = layer_dates[layer_id]
+            for key in ('start', 'end'):
+                if key in updates:
+                    layer['date_range'][key] = _iso(updates[key])
+
+
+def write_config(data, output_path=None):
+    """Serialize a layer configuration dict to JSON.
+
+    Parameters
+    ----------
+    data : dict
+        Layer configuration.
+    output_path : str or pathlib.Path, optional
+        File to write atomically. If None, only the serialized bytes are
+        returned.
+
+    Returns
+    -------
+    bytes
+        The indented JSON document.
+    """
+    payload = json_dumps(data)
+    if output_path is not None:
+        # Write to a uniquely named temporary file and rename it, so that
+        # a concurrent rsync never picks up a partially written file and
+        # concurrent writers do not share the temporary file.
+        output_path = pathlib.Path(output_path)
+        with tempfile.NamedTemporaryFile(dir=output_path.parent, prefix=output_path.name,
+                                         suffix=".tmp", delete=False) as tmp:
+            tmp.write(payload)
+        try:
+            # NamedTemporaryFile creates the file readable by the owner only
+            os.chmod(tmp.name, 0o644)
+            os.replace(tmp.name, output_path)
+        except OSError:
+            os.unlink(tmp.name)
+            raise
+    return payload
+
+
+def generate_config(remote_tile_url=None):
+    """Build the layer configuration for the current settings.
+
+    Parameters
+    ----------
+    remote_tile_url : str, optional
+        The base URL for the tile server. If None, uses settings.
+
+    Returns
+    -------
+    dict
+        Layer configuration with base_url and one entry per layer.
+    """
+    base_url = remote_tile_url or (
+        settings.get("remote_url")+"/tiles/"+settings.get("cruise_name"))
+    data = copy.deepcopy(_LAYER_TEMPLATE)
+    data["base_url"] = base_url
+    for layer in data["layers"]:
+        layer_id = layer["id"]
+        layer["vmin"] = settings[layer_id]["vmin"]
+        layer["vmax"] = settings[layer_id]["vmax"]
+        layer["cmap"] = settings[layer_id]["cmap"]
+        layer.update(copy.deepcopy(_COMMON_SETTINGS))
+    return data
+
 
 def generate_file(json_file_path="./", remote_tile_url=None):
     """Generate a JSON configuration file for map layers.
@@ -165,80 +347,5 @@ def generate_file(json_file_path="./", remote_tile_url=None):
     config_file_path : str or pathlib.Path, optional
         Directory path where the file will be saved, by default "./".
     """
-    base_url = settings.get("remote_url")+"/tiles/"+settings.get("cruise_name")
-    base_url = remote_tile_url or base_url
-    # Define layer configurations
-    layers_config = [
-        {
-            "id": "ssh",
-            "name": "SSH CMEMS 0.125°  ",
-            "url_path": "ssh",
-            "attribution": "Copernicus 1/125° SSH -0.75–0.75 m",
-            "vmin": settings["ssh"]["vmin"],
-            "vmax": settings["ssh"]["vmax"],
-            "cmap": settings["ssh"]["cmap"],
-        },
-        {
-            "id": "ostia",
-            "name": "SST OSTIA 5km     ",
-            "url_path": "ostia",
-            "attribution": "OSTIA 2km SST 10–28°C",
-            "vmin": settings["ostia"]["vmin"],
-            "vmax": settings["ostia"]["vmax"],
-            "cmap": settings["ostia"]["cmap"],
-        },
-        {
-            "id": "globcolour",
-            "name": "Chl GlobColour 4km",
-            "url_path": "globcolour",
-            "attribution": "Globcolour 4km Chl 0.01-100 mg/m3",
-            "vmin": settings["globcolour"]["vmin"],
-            "vmax": settings["globcolour"]["vmax"],
-            "cmap": settings["globcolour"]["cmap"],
-        },
-    ]
-
-    # Common settings for all layers
-    common_settings = {
-        "date_range": {
-            "start": "2026-01-08",
-            "end": "2026-01-14"
-        },
-        "exclusive": False,
-        "collapsed": False
-    }
-
-    # Build complete layer objects
-    layers = []
-    for layer in layers_config:
-        layer_obj = {
-            "id": layer["id"],
-            "name": layer["name"],
-            "url_template": f"{{base_url}}/{layer['url_path']}/{{date}}/{{z}}/{{x}}/{{y}}.png",
-            "attribution": layer["attribution"],
-            "vmin": layer["vmin"],
-            "vmax": layer["vmax"],
-            "cmap": layer["cmap"],
-            **common_settings
-        }
-        layers.append(layer_obj)
-
-    # Jinja2 template for the JSON structure
-    template_str = """
-{
-  "base_url": "{{ base_url }}",
-  "layers": {{ layers | tojson(indent=4) }}
-}"""
-
-    template = Template(template_str)
-
-    # Render the template
-    rendered = template.render(
-        base_url=base_url,
-        layers=layers
-    )
-
-    # Write to file
     output_path = pathlib.Path(json_file_path) / "layer_config.json"
-    with open(output_path, "w") as fp:
-        fp.write(rendered)
+    write_config(generate_config(remote_tile_url), output_path)
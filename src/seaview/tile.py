@@ -4,21 +4,128 @@ This module provides functions to generate slippy map tiles from various
 oceanographic data sources including SSH (Sea Surface Height), SST (Sea
 Surface Temperature), and chlorophyll concentration.
 """
+import functools
+import importlib
+import logging
+import multiprocessing
+import os
 import pathlib
+import time
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
-import numpy as np
-import pandas as pd
-import sysrsync
-from copernicusmarine import CoordinatesOutOfDatasetBounds
-
-from .tilers import rectlinear as rectlin_tiler
-from .data_sources import cmems_ssh, ostia as ostia_sst
-from .data_sources import globcolour as cmems_globcolour
-from .data_sources import gebco_bathy
-from .utils import vprint
+from .utils import (vprint, set_verbose, find_ssh_key, rsync_rsh, iso_day,
+                    DateInFutureError)
 from . import config
 settings = config.settings
 
+logger = logging.getLogger(__name__)
+
+# Number of tries of a tile transfer before giving up
+_RSYNC_ATTEMPTS = 3
+
+# Written to a tile directory once all its zoom levels are generated
+_DONE_MARKER = ".done"
+
+# Written to the tile root once the tile directories generated before the
+# done markers were introduced have been given one
+_MARKERS_MIGRATED = ".done_markers"
+
+# The tiler and data source modules pull in matplotlib, xarray, and the
+# Copernicus Marine toolbox. They are imported on first use so that
+# tiles_exists() and sync() stay cheap. numpy and sysrsync are imported by
+# the functions that use them for the same reason.
+_LAZY_MODULES = {
+    "rectlin_tiler": ".tilers.rectlinear",
+    "cmems_ssh": ".data_sources.cmems_ssh",
+    "ostia_sst": ".data_sources.ostia",
+    "cmems_globcolour": ".data_sources.globcolour",
+    "gebco_bathy": ".data_sources.gebco_bathy",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_MODULES:
+        module = importlib.import_module(_LAZY_MODULES[name], __package__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _load(name):
+    """Return a lazily imported module, importing it if needed."""
+    return globals().get(name) or __getattr__(name)
+
+
+def _coord_range(coord):
+    """Return the minimum and maximum of a coordinate.
+
+    Regular 1D coordinates are sorted, so only the end points are read.
+
+    Parameters
+    ----------
+    coord : xarray.DataArray
+        Latitude or longitude coordinate.
+
+    Returns
+    -------
+    tuple of float
+        Minimum and maximum value.
+    """
+    import numpy as np
+    values = np.asarray(coord.data)
+    if values.ndim == 1 and values.size > 0:
+        first, last = float(values[0]), float(values[-1])
+        return min(first, last), max(first, last)
+    return float(coord.min()), float(coord.max())
+
+
+def _as_float32(coord):
+    """Return a coordinate as a contiguous float32 array for the tiler."""
+    import numpy as np
+    return np.ascontiguousarray(coord.data, dtype=np.float32)
+
+
+@functools.lru_cache(maxsize=8)
+def _as_path(path):
+    return pathlib.Path(path)
+
+
+def _tile_root():
+    """Return the local tile directory as a path.
+
+    The path object is cached per setting value, so it follows
+    environment changes without being rebuilt for every tile check.
+    """
+    return _as_path(settings["tile_dir"])
+
+
+@functools.lru_cache(maxsize=8)
+def _migrate_done_markers(root):
+    """Mark the tile directories generated before the done markers.
+
+    Tile directories written by older versions have no done marker and
+    would otherwise all be generated and uploaded again. The first time a
+    tile root is used, every non-empty date directory and the bathymetry
+    directory get a marker, after which missing markers again mean an
+    interrupted run.
+
+    Parameters
+    ----------
+    root : pathlib.Path
+        The local tile directory.
+    """
+    if (root / _MARKERS_MIGRATED).is_file():
+        return
+    if root.is_dir():
+        tile_dirs = [*root.glob("*/[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]"),
+                     root / "gebco"]
+        for tilepath in tile_dirs:
+            if tilepath.is_dir() and any(tilepath.iterdir()):
+                (tilepath / _DONE_MARKER).touch()
+    root.mkdir(parents=True, exist_ok=True)
+    (root / _MARKERS_MIGRATED).touch()
+
 
 def tiles_exists(id, dtm):
     """Check if tiles already exist for a given product and date.
@@ -33,11 +140,13 @@ def tiles_exists(id, dtm):
     Returns
     -------
     bool
-        True if the tile directory exists, False otherwise.
+        True if the tiles were generated completely, False otherwise. A
+        directory left by an interrupted run does not count.
     """
-    dtm = str(pd.to_datetime(dtm).date())
-    tilepath = pathlib.Path(settings["tile_dir"]) / id / dtm
-    return tilepath.is_dir()
+    _migrate_done_markers(_tile_root())
+    tilepath = _tile_root() / id / iso_day(dtm)
+    return (tilepath / _DONE_MARKER).is_file()
+
 
 def bathy(dtm=None, verbose=True, force=True):
     """Generate bathymetry tiles from GEBCO data.
@@ -51,37 +160,127 @@ def bathy(dtm=None, verbose=True, force=True):
     force : bool, optional
         Force regeneration even if tiles exist, by default True.
     """
-    tile_base = pathlib.Path(settings["tile_dir"]) / "gebco"
-    if tile_base.is_dir() and not force:
+    import numpy as np
+    _migrate_done_markers(_tile_root())
+    tile_base = _tile_root() / "gebco"
+    if (tile_base / _DONE_MARKER).is_file() and not force:
         return
-    ds = gebco_bathy.open_dataset(dtm=dtm)
+    ds = _load("gebco_bathy").open_dataset(dtm=dtm)
     tile_base.mkdir(parents=True, exist_ok=True)
+    (tile_base / _DONE_MARKER).unlink(missing_ok=True)
 
-    settings.set("verbose", verbose)
-    generator = rectlin_tiler.SlippyTileGenerator(
-        min_lat=float(ds.latitude.min()),
-        max_lat=float(ds.latitude.max()),
-        min_lon=float(ds.longitude.min()),
-        max_lon=float(ds.longitude.max())
-    )
+    set_verbose(verbose)
+    min_lat, max_lat = _coord_range(ds.latitude)
+    min_lon, max_lon = _coord_range(ds.longitude)
+    generator = _load("rectlin_tiler").SlippyTileGenerator(
+        min_lat=min_lat, max_lat=max_lat, min_lon=min_lon, max_lon=max_lon)
     generator.generate_tiles(np.squeeze(ds["elevation"].data),
-                             ds.latitude.data,
-                             ds.longitude.data,
+                             _as_float32(ds.latitude),
+                             _as_float32(ds.longitude),
                              tile_base,
                              settings["zoom_levels"],
+                             num_workers=_tile_workers(),
                              cmap=cmr.ocean,
                              levels=np.arange(-6000,100,100),
                              vmin=-6000,
                              vmax=0,
                              add_contour_lines=True,
                              contour_levels=np.arange(-6000,0,500))
-    settings.set("tiles_updated", True)
+    (tile_base / _DONE_MARKER).touch()
+    _mark_tiles_updated()
+
+def _tile_workers():
+    """Return the number of processes rendering the tiles of a product.
+
+    All zoom levels of a product share one pool of this size. Set with
+    the ``tile_workers`` setting. As :func:`all` renders the products
+    concurrently, it defaults to an equal share of the CPUs per product.
+    """
+    return (settings.get("tile_workers")
+            or max(1, (os.cpu_count() or 1) // len(PRODUCTS)))
 
-def ssh(dtm, verbose=True, force=True):
-    """Generate SSH (Sea Surface Height) tiles for a given date.
+
+def _mark_tiles_updated():
+    """Flag that new tiles were generated and need to be synced.
+
+    Days and products are rendered in separate processes, which report
+    new tiles through their return value. The flag is only set from the
+    main thread of the process that collects them.
+    """
+    # Setting the flag goes through Dynaconf's merge machinery, so only do
+    # it when it changes
+    if not settings.get("tiles_updated"):
+        settings.set("tiles_updated", True)
+
+
+def _kelvin_to_celsius(arr):
+    """Convert temperatures from Kelvin to degrees Celsius in place."""
+    import numpy as np
+    arr -= np.float32(273.15)
+    return arr
+
+
+def _log_chlorophyll(arr):
+    """Take the natural log of chlorophyll in place.
+
+    Missing and non-positive values are set to NaN without taking their log.
+    """
+    import numpy as np
+    arr[~(arr > 0)] = np.nan
+    np.log(arr, out=arr)
+    return arr
+
+
+# Data source module, data variable, transform, and colour scale of each
+# tile product. Products without a "style" use the colour scale given by
+# the settings section with the product name.
+PRODUCTS = {
+    "ssh": dict(source="cmems_ssh", var="sla", label="SSH"),
+    "ostia": dict(source="ostia_sst", var="analysed_sst", label="SST",
+                  xform=_kelvin_to_celsius),
+    "globcolour": dict(source="cmems_globcolour", var="CHL", label="globcolour",
+                       xform=_log_chlorophyll,
+                       style=dict(cmap="nipy_spectral", vmin=-4.6, vmax=4.6,
+                                  levels=50)),
+}
+
+
+def _source_is_newer(product, dtm):
+    """Check if the local data file of a product is newer than its tiles.
+
+    Parameters
+    ----------
+    product : str
+        Product identifier, one of the keys of :data:`PRODUCTS`.
+    dtm : str or datetime-like
+        The date to check.
+
+    Returns
+    -------
+    bool
+        True if the data file was written after the tiles were completed,
+        for example because the data was updated and downloaded again.
+    """
+    source = _load(PRODUCTS[product]["source"])
+    fn = source.datadir() / source.filename(dtm)
+    marker = _tile_root() / product / iso_day(dtm) / _DONE_MARKER
+    try:
+        return fn.stat().st_mtime > marker.stat().st_mtime
+    except FileNotFoundError:
+        return False
+
+
+def _tile(product, dtm, verbose=True, force=True):
+    """Generate the tiles of one product for a given date.
+
+    Existing tiles are kept unless ``force`` is set or the local data file
+    is newer than the tiles. Tiles left by an interrupted run are kept too,
+    and only the missing ones are generated.
 
     Parameters
     ----------
+    product : str
+        Product identifier, one of the keys of :data:`PRODUCTS`.
     dtm : str or datetime-like
         The date to generate tiles for.
     verbose : bool, optional
@@ -89,33 +288,63 @@ def ssh(dtm, verbose=True, force=True):
     force : bool, optional
         Force regeneration even if tiles exist, by default True.
     """
-    if tiles_exists("ssh", dtm) and not force:
+    import numpy as np
+    date_str = iso_day(dtm)
+    done = not force and tiles_exists(product, date_str)
+    if done and not _source_is_newer(product, date_str):
         return
-    settings.set("verbose", verbose)
-    dtm = pd.to_datetime(dtm, utc=True)
+    spec = PRODUCTS[product]
+    set_verbose(verbose)
+    from copernicusmarine import CoordinatesOutOfDatasetBounds
     try:
-        ds = cmems_ssh.open_dataset(dtm=dtm)
+        ds = _load(spec["source"]).open_dataset(dtm=date_str)
     except CoordinatesOutOfDatasetBounds:
-        print(f"  {dtm.date()} failed for SSH")
+        logger.warning("%s failed for %s", date_str, spec['label'])
         return
-    tile_base = pathlib.Path(settings["tile_dir"]) / "ssh" / str(dtm.date())
+    tile_base = _tile_root() / product / date_str
     tile_base.mkdir(parents=True, exist_ok=True)
-
-    generator = rectlin_tiler.SlippyTileGenerator(
-        min_lat=float(ds.latitude.min()),
-        max_lat=float(ds.latitude.max()),
-        min_lon=float(ds.longitude.min()),
-        max_lon=float(ds.longitude.max())
-    )
-    generator.generate_tiles(np.squeeze(ds.sla.data),
-                             ds.latitude.data,
-                             ds.longitude.data,
+    (tile_base / _DONE_MARKER).unlink(missing_ok=True)
+
+    # The datasets are opened with dask, so squeeze and float32 cast are
+    # computed chunk by chunk into a new array when .values is read. The
+    # transform then updates that array in place.
+    data = getattr(ds, spec["var"]).squeeze().astype(np.float32).values
+    if "xform" in spec:
+        data = spec["xform"](data)
+    style = spec.get("style") or dict(cmap=settings[product]["cmap"],
+                                      vmin=settings[product]["vmin"],
+                                      vmax=settings[product]["vmax"])
+    min_lat, max_lat = _coord_range(ds.latitude)
+    min_lon, max_lon = _coord_range(ds.longitude)
+    generator = _load("rectlin_tiler").SlippyTileGenerator(
+        min_lat=min_lat, max_lat=max_lat, min_lon=min_lon, max_lon=max_lon)
+    generator.generate_tiles(data,
+                             _as_float32(ds.latitude),
+                             _as_float32(ds.longitude),
                              tile_base,
                              settings["zoom_levels"],
-                             cmap=settings["ssh"]["cmap"],
-                             vmin=settings["ssh"]["vmin"],
-                             vmax=settings["ssh"]["vmax"])
-    settings.set("tiles_updated", True)
+                             num_workers=_tile_workers(),
+                             # Without the marker and without newer data,
+                             # the directory is left by an interrupted run
+                             skip_existing=not (force or done),
+                             **style)
+    (tile_base / _DONE_MARKER).touch()
+    _mark_tiles_updated()
+
+
+def ssh(dtm, verbose=True, force=True):
+    """Generate SSH (Sea Surface Height) tiles for a given date.
+
+    Parameters
+    ----------
+    dtm : str or datetime-like
+        The date to generate tiles for.
+    verbose : bool, optional
+        Enable verbose output, by default True.
+    force : bool, optional
+        Force regeneration even if tiles exist, by default True.
+    """
+    _tile("ssh", dtm, verbose=verbose, force=force)
 
 
 def sst(dtm, verbose=True, force=True):
@@ -150,34 +379,7 @@ def ostia(dtm, verbose=True, force=True):
     force : bool, optional
         Force regeneration even if tiles exist, by default True.
     """
-    if tiles_exists("ostia", dtm) and not force:
-        return
-    settings.set("verbose", verbose)
-    dtm = pd.to_datetime(dtm, utc=True)
-    try:
-        ds = ostia_sst.open_dataset(dtm=dtm)
-    except CoordinatesOutOfDatasetBounds:
-        print(f"  {dtm.date()} failed for SST")
-        return
-    tile_base = pathlib.Path(settings["tile_dir"]) / "ostia" / str(dtm.date())
-    tile_base.mkdir(parents=True, exist_ok=True)
-
-    generator = rectlin_tiler.SlippyTileGenerator(
-        min_lat=float(ds.latitude.min()),
-        max_lat=float(ds.latitude.max()),
-        min_lon=float(ds.longitude.min()),
-        max_lon=float(ds.longitude.max())
-    )
-    generator.generate_tiles(np.squeeze(ds.analysed_sst.data)-273.15,
-                             ds.latitude.data,
-                             ds.longitude.data,
-                             tile_base,
-                             settings["zoom_levels"],
-                             cmap=settings["ostia"]["cmap"],
-                             vmin=settings["ostia"]["vmin"],
-                             vmax=settings["ostia"]["vmax"])
-    settings.set("tiles_updated", True)
-
+    _tile("ostia", dtm, verbose=verbose, force=force)
 
 
 def globcolour(dtm, verbose=True, force=True):
@@ -195,40 +397,161 @@ def globcolour(dtm, verbose=True, force=True):
     force : bool, optional
         Force regeneration even if tiles exist, by default True.
     """
-    if tiles_exists("globcolour", dtm) and not force:
+    _tile("globcolour", dtm, verbose=verbose, force=force)
+
+
+def prefetch(dtm1, dtm2, force=False):
+    """Download the SSH, SST, and GlobColour data for a range of dates.
+
+    Each product is fetched with one multi-day request instead of one
+    request per day, and the products are fetched concurrently. Products
+    that fail, for example because the last days are not yet available,
+    are left to the daily retrieval done when the tiles are generated.
+
+    Parameters
+    ----------
+    dtm1 : str or datetime-like
+        First date of the range.
+    dtm2 : str or datetime-like
+        Last date of the range, inclusive.
+    force : bool, optional
+        Force download even if files exist, by default False.
+    """
+    # The requests are network bound, so threads overlap their latency
+    with ThreadPoolExecutor(max_workers=len(PRODUCTS)) as executor:
+        futures = {executor.submit(_load(spec["source"]).retrieve_range,
+                                   dtm1, dtm2, force=force): id
+                   for id, spec in PRODUCTS.items()}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                logger.warning("Multi-day download failed for %s: %s", futures[future], e)
+
+
+def _fetch(id, dtm, force=False):
+    """Download the data of one product for a day if its tiles are needed.
+
+    A failing download is reported and not raised, the tile generation
+    then tries again when it opens the data.
+
+    Parameters
+    ----------
+    id : str
+        Product identifier, one of the keys of :data:`PRODUCTS`.
+    dtm : str or datetime-like
+        The date to download data for.
+    force : bool, optional
+        Download data even if the tiles exist, by default False.
+    """
+    if not force and tiles_exists(id, dtm):
         return
-    settings.set("verbose", verbose)
-    dtm = pd.to_datetime(dtm, utc=True)
     try:
-        ds = cmems_globcolour.open_dataset(dtm=dtm)
-    except CoordinatesOutOfDatasetBounds:
-        print(f"  {dtm.date()} failed for globcolour")
-        return
-    tile_base = pathlib.Path(settings["tile_dir"]) / "globcolour" / str(dtm.date())
-    tile_base.mkdir(parents=True, exist_ok=True)
+        _load(PRODUCTS[id]["source"]).retrieve(dtm=dtm)
+    except Exception as e:
+        logger.warning("Download failed for %s: %s", id, e)
 
-    generator = rectlin_tiler.SlippyTileGenerator(
-        min_lat=float(ds.latitude.min()),
-        max_lat=float(ds.latitude.max()),
-        min_lon=float(ds.longitude.min()),
-        max_lon=float(ds.longitude.max())
-    )
-    generator.generate_tiles(np.log(np.squeeze(ds.CHL.data)),
-                             ds.latitude.data,
-                             ds.longitude.data,
-                             tile_base,
-                             settings["zoom_levels"],
-                             cmap="nipy_spectral",
-                             vmin=-4.6,
-                             vmax=4.6,
-                             levels=50)
-    settings.set("tiles_updated", True)
+
+def _direct_upload():
+    """Check if tiles are uploaded by the worker that rendered them.
+
+    Set the ``upload_mode`` setting to ``"direct"`` to upload each product
+    directory as soon as it is generated, while the other products are
+    still rendering, instead of in a sync after all of them.
+    """
+    return settings.get("upload_mode") == "direct" and settings.get("remote_sync")
+
+
+def _upload(id, dtm):
+    """Copy the tiles of one product and date to the tile server.
+
+    Parameters
+    ----------
+    id : str
+        Product identifier, one of the keys of :data:`PRODUCTS`.
+    dtm : str or datetime-like
+        The date of the tiles.
+    """
+    date_str = iso_day(dtm)
+    remote = pathlib.Path(settings.get("remote_tile_dir")) / id / date_str
+    _rsync(str(_tile_root() / id / date_str), str(remote), find_ssh_key())
+
+
+def _init_process(values, verbose):
+    """Copy the settings of the parent process into a pool worker."""
+    settings.update(values)
+    set_verbose(verbose)
+
+
+def _process_pool(max_workers):
+    """Return a process pool for rendering products or days.
+
+    The workers are started from a forkserver rather than forked from this
+    process, which may have download or sync threads running. A forked
+    child could inherit a lock held by one of them, such as a logging,
+    HDF5, or HTTP connection pool lock, and deadlock. The workers get a
+    copy of the current settings, including changes made at runtime.
+
+    Parameters
+    ----------
+    max_workers : int
+        Number of worker processes.
+
+    Returns
+    -------
+    concurrent.futures.ProcessPoolExecutor
+        The process pool.
+    """
+    values = {name: value for name, value in settings.as_dict().items()
+              if name.upper() not in config._RUNTIME_KEYS}
+    return ProcessPoolExecutor(max_workers=max_workers,
+                               mp_context=multiprocessing.get_context("forkserver"),
+                               initializer=_init_process,
+                               initargs=(values, bool(settings.get("verbose"))))
+
+
+def _dispatch(args):
+    """Generate the tiles of one product in a worker process.
+
+    With the ``direct`` upload mode, new tiles are also uploaded by the
+    worker. A failed upload is reported and left to a full :func:`sync`.
+
+    Parameters
+    ----------
+    args : tuple
+        Product name, date, verbose flag, and force flag.
+
+    Returns
+    -------
+    bool
+        True if the worker generated new tiles.
+    """
+    product, dtm, verbose, force = args
+    settings.set("tiles_updated", False)
+    globals()[product](dtm, verbose=verbose, force=force)
+    updated = bool(settings.get("tiles_updated"))
+    if updated and _direct_upload():
+        id = {"sst": "ostia"}.get(product, product)
+        try:
+            _upload(id, dtm)
+        except RuntimeError as e:
+            logger.warning("Upload failed for %s: %s", id, e)
+    return updated
 
 
 def all(dtm, force=False, verbose=False):
     """Generate all tile products for a given date.
 
-    Generates SSH, SST, and GlobColour tiles.
+    Generates SSH, SST, and GlobColour tiles. The data for the three
+    products is downloaded concurrently, and each product is rendered in
+    its own process as soon as its download is done, so rendering
+    overlaps with the downloads still in progress. Each product is
+    reported as soon as it is done. Products whose tiles are complete and
+    not older than their data are skipped without starting a worker.
+
+    The workers are started from a forkserver and import the ``__main__``
+    module of the caller, so scripts calling this function must do so
+    under an ``if __name__ == "__main__":`` guard.
 
     Parameters
     ----------
@@ -238,56 +561,120 @@ def all(dtm, force=False, verbose=False):
         Force regeneration even if tiles exist, by default False.
     verbose : bool, optional
         Enable verbose output, by default False.
+
+    Raises
+    ------
+    DateInFutureError
+        If the date is after today, before any data is requested.
+    """
+    # ISO date strings sort in date order
+    if iso_day(dtm) > date.today().isoformat():
+        raise DateInFutureError(f"No data for {iso_day(dtm)} yet")
+    # Tile generating function and PRODUCTS key of each product
+    products = {"ssh": "ssh", "sst": "ostia", "globcolour": "globcolour"}
+    # Leave out the products whose tiles are complete and up to date, so no
+    # worker is started just to find that out
+    pending = {product: id for product, id in products.items()
+               if force or not tiles_exists(id, dtm) or _source_is_newer(id, dtm)}
+    for product in products:
+        if product not in pending:
+            logger.info("No new %s tiles", product)
+    if not pending:
+        return
+    with _process_pool(len(pending)) as renders, \
+            ThreadPoolExecutor(max_workers=len(pending)) as downloads:
+        fetched = {downloads.submit(_fetch, id, dtm, force=force): product
+                   for product, id in pending.items()}
+        futures = {}
+        for future in as_completed(fetched):
+            product = fetched[future]
+            futures[renders.submit(_dispatch, (product, dtm, verbose, force))] = product
+        for future in as_completed(futures):
+            product = futures[future]
+            if future.result():
+                logger.info("Processed %s tiles", product)
+                _mark_tiles_updated()
+            else:
+                logger.info("No new %s tiles", product)
+
+
+def _rsync(local, remote, key=None):
+    """Copy a local directory to the tile server, retrying on failure.
+
+    A failing transfer is retried with exponential backoff, since
+    concurrent transfers make transient SSH failures more likely.
+
+    Parameters
+    ----------
+    local : str
+        Local directory.
+    remote : str
+        Destination directory on the tile server.
+    key : pathlib.Path, optional
+        SSH key file, see :func:`seaview.utils.find_ssh_key`.
     """
-    print("Process SSH tiles")
-    ssh(dtm, verbose=verbose, force=force)
-    print("Process SST tiles")
-    sst(dtm, verbose=verbose, force=force)
-    print("Process globcolour tiles")
-    globcolour(dtm, verbose=verbose, force=force)
+    import sysrsync
+    for attempt in range(_RSYNC_ATTEMPTS):
+        try:
+            sysrsync.run(source=local,
+                         destination=remote,
+                         destination_ssh='tvarminne',
+                         # Done markers and tiles still being written
+                         # stay local
+                         options=['--mkpath', '-az', '--compress-level=1',
+                                  f'--exclude={_DONE_MARKER}',
+                                  f'--exclude={_MARKERS_MIGRATED}',
+                                  '--exclude=*.tmp', *rsync_rsh(key)],
+                         sync_source_contents=True,
+                         strict=True
+                         )
+            return
+        except Exception as e:
+            if attempt == _RSYNC_ATTEMPTS - 1:
+                raise RuntimeError(f"Failed to sync {local}") from e
+            vprint(f"Sync of {local} failed, retrying: {e}")
+            time.sleep(2 ** attempt)
 
 
 def sync(dtm=None):
     """Synchronize local tiles to remote server via rsync.
 
     Uses sysrsync to transfer tiles from the local tile directory
-    to the configured remote server.
+    to the configured remote server. When syncing one date, the product
+    directories are transferred concurrently by up to ``sync_workers``
+    (default 8) rsync processes, over one shared ssh connection opened by
+    the first transfer. With the ``direct`` upload mode the tiles
+    of a date are already uploaded when they are generated, and syncing
+    one date does nothing.
 
     Generate a key without a password using
     ssh-keygen -f /home/bror/.config/seaview/sea_id_ed25519
     """
-    def rsync(local, remote, key=None):
-        try:
-            sysrsync.run(source=local,
-                        destination=remote,
-                        destination_ssh='tvarminne',
-                        options=['--mkpath', '-a'],
-                        sync_source_contents=True,
-                        strict=True,
-                        private_key=key
-                        )
-        except Exception as e:
-            print(e)
-            raise(RuntimeError)
-    key = pathlib.Path.cwd() / "sea_id_ed25519"
-    if not key.is_file():
-        key  = pathlib.Path.home() / ".ssh/sea_id_ed25519"
-    if not key.is_file():
-        key  = pathlib.Path.home() / ".config/seaview/sea_id_ed25519"
-    if not key.is_file():
-        print("Can't find an ssh key file, will use the default.")
-        key = None
+    if dtm is not None and _direct_upload():
+        return
+    key = find_ssh_key()
     vprint(f"key file used:{key}")
     if dtm is not None:
-        dtm = pd.to_datetime(dtm)
-        local_paths = pathlib.Path(settings.get("tile_dir")).glob(f"*/{dtm.date()}")
-
-        for local in local_paths:
-            remote = pathlib.Path(settings.get("remote_tile_dir")) / "/".join(local.parts[-2:])
-            vprint(f"Local path: {local}", 10)
-            vprint(f"remote path: {remote}", 10)
-            rsync(str(local),str(remote), key)
-        pass
+        local_paths = list(_tile_root().glob(
+            f"*/{iso_day(dtm)}"))
+        if not local_paths:
+            return
+        remote_dir = pathlib.Path(settings.get("remote_tile_dir"))
+
+        def transfer(local):
+            remote = remote_dir / "/".join(local.parts[-2:])
+            vprint(lambda: f"Local path: {local}", 10)
+            vprint(lambda: f"remote path: {remote}", 10)
+            _rsync(str(local), str(remote), key)
+
+        # Concurrent first connections would each become an ssh master
+        # and do their own key exchange. The first transfer opens the
+        # shared connection alone, the others then multiplex over it.
+        transfer(local_paths[0])
+        rest = local_paths[1:]
+        if rest:
+            max_workers = min(len(rest), settings.get("sync_workers", 8))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(transfer, rest))
     else:
-        rsync(settings["tile_dir"], settings["remote_tile_dir"], key)
-    settings.set("tiles_updated", False)
+        _rsync(settings["tile_dir"], settings["remote_tile_dir"], key)
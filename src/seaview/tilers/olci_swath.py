@@ -26,7 +26,7 @@ import mercantile
 import io
 
 from .utils import filter_small_contours
-from ..utils import vprint, lonlat_to_webmercator
+from ..utils import vprint, set_verbose, lonlat_to_webmercator
 from .. import config
 
 settings = config.settings
@@ -201,7 +201,7 @@ class OLCISwathTileGenerator:
                 y_chunks.append(y_wm)
                 data_chunks.append(data_bounded)
 
-                vprint(f"Scene {i+1}/{len(scenes)}: {n_pts} points")
+                vprint(lambda: f"Scene {i+1}/{len(scenes)}: {n_pts} points")
 
                 # Flush to disk if accumulated too much
                 if total_points > _CHUNK_SIZE:
@@ -332,7 +332,7 @@ class OLCISwathTileGenerator:
                 for future in as_completed(futures):
                     completed += 1
                     if completed % 100 == 0 or completed == len(tiles):
-                        vprint(f"Progress: {completed}/{len(tiles)} tiles")
+                        vprint(lambda: f"Progress: {completed}/{len(tiles)} tiles")
 
                     try:
                         future.result()
@@ -636,7 +636,7 @@ def olci_swath_tiles(
     >>> scenes = extract_swath_scenes(dtm="2023-06-03")
     >>> olci_swath_tiles(scenes, "/path/to/tiles/chl")
     """
-    settings.set("verbose", verbose)
+    set_verbose(verbose)
 
     min_lat = settings.get("lat1")
     max_lat = settings.get("lat2")
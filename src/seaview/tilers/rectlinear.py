@@ -4,53 +4,39 @@ This module generates filled contour slippy map tiles from rectilinear
 (gridded) data with parallel processing. Uses mercantile for robust tile
 calculations.
 
-Data is transformed to Web Mercator (EPSG:3857) before triangulation to
-ensure proper alignment with slippy map tiles.
+Data on a regular 1D lat/lon grid is sampled directly at the tile pixels
+and coloured by contour band. Other data, and tiles with contour lines,
+are transformed to Web Mercator (EPSG:3857) and triangulated to ensure
+proper alignment with slippy map tiles.
 """
 
+import functools
+import multiprocessing
+import os
 from pathlib import Path
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import Tuple, Optional, List
 import numpy as np
+import pandas as pd
 import matplotlib
 matplotlib.use('Agg')
-import matplotlib.pyplot as plt
 from matplotlib import tri
+from matplotlib.figure import Figure
 from PIL import Image
 import mercantile
 import io
-from pyproj import Transformer
 from tqdm import tqdm
 
 from .utils import filter_small_contours
-from ..utils import vprint
+from ..utils import (vprint, set_verbose, lonlat_to_webmercator,
+                     lonlat_to_webmercator_separable)
 from .. import config
 
 settings = config.settings
 
-# Web Mercator transformer (lon/lat to x/y meters)
-_transformer_to_webmerc = Transformer.from_crs(
-    "EPSG:4326", "EPSG:3857", always_xy=True
-)
-
-
-def lonlat_to_webmercator(lons: np.ndarray, lats: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-    """Transform longitude/latitude arrays to Web Mercator coordinates.
-
-    Parameters
-    ----------
-    lons : numpy.ndarray
-        Longitude values in degrees.
-    lats : numpy.ndarray
-        Latitude values in degrees.
-
-    Returns
-    -------
-    tuple of numpy.ndarray
-        (x, y) coordinates in Web Mercator meters.
-    """
-    x, y = _transformer_to_webmerc.transform(lons, lats)
-    return x.astype(np.float32), y.astype(np.float32)
+# Tiles are written often and are small, so favour encoding speed over
+# file size. Level 1 encodes several times faster than the default level 6.
+_PNG_OPTIONS = dict(format="PNG", optimize=False, compress_level=1)
 
 
 class SlippyTileGenerator:
@@ -74,9 +60,12 @@ class SlippyTileGenerator:
     ----------
     TILE_SIZE : int
         Size of output tiles in pixels (256).
+    POOL_RESET_TILES : int
+        Number of tiles after which the worker pool is rebuilt (5000).
     """
 
     TILE_SIZE = 256
+    POOL_RESET_TILES = 5000
 
     def __init__(self, min_lat: float = None, max_lat: float = None,
                  min_lon: float = None, max_lon: float = None):
@@ -111,7 +100,8 @@ class SlippyTileGenerator:
                        num_workers: int = 10, cmap: str = 'RdBu',
                        levels: int = 20, vmin: float | None = None,
                        vmax: Optional[float] = None,
-                       add_contour_lines: bool = False, contour_levels: int = 5):
+                       add_contour_lines: bool = False, contour_levels: int = 5,
+                       skip_existing: bool = False):
         """Generate tiles for multiple zoom levels in parallel.
 
         Parameters
@@ -140,9 +130,15 @@ class SlippyTileGenerator:
             Whether to add contour lines on top of filled contours, by default False.
         contour_levels : int, optional
             Number of contour line levels, by default 5.
+        skip_existing : bool, optional
+            Keep tiles that already exist in output_dir and only generate
+            the missing ones, for example to resume an interrupted run.
+            By default False.
         """
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
+        # Directories remembered from an earlier call may have been removed
+        _DIR_CACHE.clear()
 
         # Convert 1D coordinates to 2D grid if needed
         if scene_lats.ndim == 1 and scene_lons.ndim == 1:
@@ -150,86 +146,629 @@ class SlippyTileGenerator:
             lat_descending = scene_lats[0] > scene_lats[-1]
             lon_descending = scene_lons[0] > scene_lons[-1]
 
-            # Work with copies to avoid modifying original data
-            lats_1d = scene_lats[::-1] if lat_descending else scene_lats.copy()
-            lons_1d = scene_lons[::-1] if lon_descending else scene_lons.copy()
-            data_work = scene_data.copy()
-
-            # Flip data arrays to match coordinate ordering
-            if lat_descending:
-                data_work = np.flip(data_work, axis=0)
-            if lon_descending:
-                data_work = np.flip(data_work, axis=1)
-
-            # Create 2D grids
-            lon_grid, lat_grid = np.meshgrid(lons_1d, lats_1d)
+            # Reversed views put the coordinates in ascending order. The
+            # scene is only read below, so nothing needs to be copied.
+            lat_step = -1 if lat_descending else 1
+            lon_step = -1 if lon_descending else 1
+            lats_1d = scene_lats[::lat_step]
+            lons_1d = scene_lons[::lon_step]
+            data_work = scene_data[::lat_step, ::lon_step]
+
+            # 2D views of the coordinates, without allocating full grids
+            lon_grid = np.broadcast_to(lons_1d[None, :], data_work.shape)
+            lat_grid = np.broadcast_to(lats_1d[:, None], data_work.shape)
         else:
             # Already 2D
             lon_grid = scene_lons
             lat_grid = scene_lats
-            data_work = scene_data.copy()
+            data_work = scene_data
 
         # Prepare scene data
-        valid_mask = ~np.isnan(data_work)
         if vmin is None:
             vmin = float(np.nanmin(data_work))
         if vmax is None:
             vmax = float(np.nanmax(data_work))
+        vprint(f"Data range: {vmin:.4f} to {vmax:.4f}")
 
-        # Flatten arrays for triangulation using the 2D grids
-        lats_flat = lat_grid[valid_mask].astype(np.float32)
-        lons_flat = lon_grid[valid_mask].astype(np.float32)
-        data_flat = data_work[valid_mask].astype(np.float32)
+        # Regular grids are sampled directly; contour lines and 2D
+        # coordinates need the triangulation path. The two paths differ
+        # slightly: sampled tiles interpolate bilinearly within grid cells
+        # and leave cells next to missing data transparent, where
+        # tricontourf fills the triangles up to the missing points.
+        gridded = scene_lats.ndim == 1 and not add_contour_lines
+        if gridded:
+            valid = ~np.isnan(data_work)
+            rows, cols = np.flatnonzero(valid.any(axis=1)), np.flatnonzero(valid.any(axis=0))
+            footprint = (lons_1d[cols[0]], lats_1d[rows[0]],
+                         lons_1d[cols[-1]], lats_1d[rows[-1]]) if rows.size else None
+            render = _generate_gridded_tile
+            state = dict(lats=lats_1d, lons=lons_1d,
+                         data=np.ascontiguousarray(data_work, dtype=np.float32),
+                         output_dir=str(output_path),
+                         lut=_band_lut(cmap, levels, vmin, vmax),
+                         levels=_level_edges(levels, vmin, vmax))
+        else:
+            # Flatten arrays for triangulation using the 2D grids
+            valid_mask = ~np.isnan(data_work)
+            lats_flat = lat_grid[valid_mask].astype(np.float32)
+            lons_flat = lon_grid[valid_mask].astype(np.float32)
+            data_flat = data_work[valid_mask].astype(np.float32)
+
+            # Transform to Web Mercator for proper tile alignment. A
+            # regular grid only needs its two axes transformed.
+            vprint("Transforming coordinates to Web Mercator...")
+            if scene_lats.ndim == 1:
+                x_axis, y_axis = lonlat_to_webmercator_separable(lons_1d, lats_1d)
+                x_wm = np.broadcast_to(x_axis[None, :], data_work.shape)[valid_mask]
+                y_wm = np.broadcast_to(y_axis[:, None], data_work.shape)[valid_mask]
+            else:
+                x_wm, y_wm = lonlat_to_webmercator(lons_flat, lats_flat)
+            vprint(f"Processing {len(data_flat)} valid data points")
+            footprint = (lons_flat.min(), lats_flat.min(),
+                         lons_flat.max(), lats_flat.max()) if data_flat.size else None
+            render = _generate_single_tile
+            band_cmap, band_norm = _band_colormap(cmap, levels, vmin, vmax)
+            state = dict(output_dir=str(output_path), cmap=band_cmap,
+                         levels=_level_edges(levels, vmin, vmax),
+                         norm=band_norm, vmin=vmin, vmax=vmax,
+                         add_contour_lines=add_contour_lines,
+                         contour_levels=contour_levels)
+            if scene_lats.ndim == 1 and len(lats_1d) > 1 and len(lons_1d) > 1:
+                state["cell_size"] = (float(np.diff(lons_1d).mean()),
+                                      float(np.diff(lats_1d).mean()))
+            if data_flat.size:
+                order, state["index"] = _bucket_index(x_wm, y_wm)
+                x_wm, y_wm, data_flat = x_wm[order], y_wm[order], data_flat[order]
+            state.update(x_coords=x_wm, y_coords=y_wm, data=data_flat)
+
+        # One pool serves all zoom levels. It is rebuilt after
+        # POOL_RESET_TILES tiles to bound the memory growth of the
+        # Matplotlib workers. The scene arrays are handed to each worker
+        # once, only batches of tile indices are sent per task.
+        executor = None
+        tiles_in_pool = 0
+        try:
+            for zoom in tqdm(zoom_levels, desc="Zoom", leave=False):
+                # Get all tiles using mercantile
+                tiles = self.get_tiles_for_bounds(zoom)
+
+                # The x directories are created on first write, here for
+                # the blank tiles and in the workers for the rendered ones
+                zoom_dir = output_path / str(zoom)
+                if skip_existing:
+                    existing = _existing_tiles(zoom_dir)
+                    tiles = [tile for tile in tiles if (tile.x, tile.y) not in existing]
+                    if not tiles:
+                        continue
+
+                # Tiles outside the valid data get a blank tile right away
+                inside = _intersecting(tiles, footprint)
+                for tile in (tile for tile, keep in zip(tiles, inside) if not keep):
+                    x_dir = _tile_dir(zoom_dir, tile.x)
+                    _write_tile(x_dir / f"{tile.y}.png", _empty_tile_png())
+                tiles = [tile for tile, keep in zip(tiles, inside) if keep]
+                if not tiles:
+                    continue
+
+                if executor is None or tiles_in_pool >= self.POOL_RESET_TILES:
+                    if executor is not None:
+                        executor.shutdown(wait=True)
+                    # Not forked, the caller may have dask or sync threads
+                    # running whose locks a forked worker would inherit
+                    executor = ProcessPoolExecutor(
+                        max_workers=num_workers,
+                        mp_context=multiprocessing.get_context("forkserver"),
+                        initializer=_init_worker, initargs=(render, state))
+                    tiles_in_pool = 0
+                tiles_in_pool += len(tiles)
+
+                # Process tiles in parallel, a few batches per worker
+                records = np.array([(tile.z, tile.x, tile.y) for tile in tiles],
+                                   dtype=_TILE_DTYPE)
+                batches = np.array_split(records, min(len(records), num_workers * 4))
+                futures = {executor.submit(_render_tiles, batch): len(batch)
+                           for batch in batches}
+                with tqdm(total=len(records), desc="Tiles", leave=False) as progress:
+                    for future in as_completed(futures):
+                        try:
+                            errors = future.result()
+                        except Exception as e:
+                            errors = [(zoom, "*", "*", e)]
+                        for z, x, y, e in errors:
+                            print(f"Error generating tile {z}/{x}/{y}: {e}")
+                        progress.update(futures[future])
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+
+def _existing_tiles(zoom_dir: Path) -> set:
+    """Return the x and y indices of the tiles written in a zoom directory.
+
+    Each column directory is listed once, instead of checking every tile
+    path separately. Tiles are renamed into place once fully written, so
+    every listed tile is complete. Names that are not tile indices are
+    ignored.
+    """
+    existing = set()
+    try:
+        with os.scandir(zoom_dir) as entries:
+            columns = [entry for entry in entries
+                       if entry.is_dir() and entry.name.isdigit()]
+    except FileNotFoundError:
+        return existing
+    for column in columns:
+        with os.scandir(column.path) as entries:
+            existing.update((int(column.name), int(entry.name[:-4]))
+                            for entry in entries
+                            if entry.name.endswith(".png") and entry.name[:-4].isdigit())
+    return existing
 
-        # Transform to Web Mercator for proper tile alignment
-        vprint("Transforming coordinates to Web Mercator...")
-        x_wm, y_wm = lonlat_to_webmercator(lons_flat, lats_flat)
 
-        vprint(f"Processing {len(data_flat)} valid data points")
-        vprint(f"Data range: {vmin:.4f} to {vmax:.4f}")
+def _tile_bounds(xs: np.ndarray, ys: np.ndarray, zoom: int):
+    """Return the lon/lat bounds of many tiles of one zoom level at once.
+
+    Vectorized equivalent of ``mercantile.bounds``.
+
+    Parameters
+    ----------
+    xs, ys : numpy.ndarray
+        Tile x and y indices.
+    zoom : int
+        Zoom level.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        West, south, east, and north bounds in degrees.
+    """
+    n = 2.0 ** zoom
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    west = xs / n * 360.0 - 180.0
+    east = (xs + 1) / n * 360.0 - 180.0
+    north = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * ys / n))))
+    south = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (ys + 1) / n))))
+    return west, south, east, north
+
+
+def _intersecting(tiles, footprint) -> np.ndarray:
+    """Check which tiles overlap the lon/lat bounding box of the data.
+
+    Parameters
+    ----------
+    tiles : list of mercantile.Tile
+        Tiles of one zoom level to check.
+    footprint : tuple of float or None
+        West, south, east, and north bounds of the valid data, or None if
+        there is no valid data.
+
+    Returns
+    -------
+    numpy.ndarray
+        Boolean mask, True for the tiles overlapping the data bounding box.
+    """
+    if footprint is None or not tiles:
+        return np.zeros(len(tiles), dtype=bool)
+    west, south, east, north = footprint
+    tile_w, tile_s, tile_e, tile_n = _tile_bounds(
+        [tile.x for tile in tiles], [tile.y for tile in tiles], tiles[0].z)
+    return (tile_e >= west) & (tile_w <= east) & (tile_n >= south) & (tile_s <= north)
+
+
+@functools.lru_cache(maxsize=1)
+def _empty_tile_png() -> bytes:
+    """Return a fully transparent tile encoded as PNG.
+
+    The tile is encoded once per process, empty tiles are written by
+    copying these bytes.
+    """
+    buf = io.BytesIO()
+    Image.new('RGBA', (256, 256), (0, 0, 0, 0)).save(buf, **_PNG_OPTIONS)
+    return buf.getvalue()
+
+
+# Render function and scene arrays of the tiles handled by a worker process
+_WORKER_STATE = {}
 
-        for zoom in tqdm(zoom_levels, desc="Zoom", leave=False):
-            #vprint(f"\nGenerating tiles for zoom level -- {zoom}")
 
-            # Get all tiles using mercantile
-            tiles = self.get_tiles_for_bounds(zoom)
+def _init_worker(render, state):
+    """Store the render function and scene arrays in a worker process.
 
-            # Create zoom directory
-            zoom_dir = output_path / str(zoom)
-            zoom_dir.mkdir(exist_ok=True)
+    The workers are started from a forkserver, so the arrays are pickled
+    to each worker once when the pool starts, instead of once per tile.
+    """
+    _DIR_CACHE.clear()
+    _WORKER_STATE.clear()
+    _WORKER_STATE["render"] = render
+    _WORKER_STATE["state"] = state
+
+
+def _render_tile(zoom: int, tile_x: int, tile_y: int):
+    """Render one tile with the scene stored by :func:`_init_worker`."""
+    state = _WORKER_STATE["state"]
+    _tile_dir(Path(state["output_dir"]) / str(zoom), tile_x)
+    _WORKER_STATE["render"](zoom, tile_x, tile_y, **state)
+
+
+# Zoom level and indices of the tiles in a batch sent to a worker
+_TILE_DTYPE = np.dtype([("z", "i4"), ("x", "i4"), ("y", "i4")])
+
+
+def _render_tiles(records: np.ndarray) -> list:
+    """Render a batch of tiles with the scene stored by :func:`_init_worker`.
+
+    Parameters
+    ----------
+    records : numpy.ndarray
+        Tiles to render, with the :data:`_TILE_DTYPE` fields.
+
+    Returns
+    -------
+    list of tuple
+        Zoom, x, y, and exception of each tile that failed.
+    """
+    errors = []
+    for zoom, tile_x, tile_y in records.tolist():
+        try:
+            _render_tile(zoom, tile_x, tile_y)
+        except Exception as e:
+            errors.append((zoom, tile_x, tile_y, e))
+    return errors
+
+
+def _write_tile(tile_path: Path, png: bytes):
+    """Write an encoded tile atomically.
+
+    The bytes go to a temporary file next to the tile, which is then
+    renamed over it, so an interrupted run never leaves a truncated tile
+    that a resumed run would take as done.
+    """
+    tmp_path = tile_path.with_name(f"{tile_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(png)
+    os.replace(tmp_path, tile_path)
+
+
+# Tile directories known to exist, during one generate_tiles call in the
+# main process or for the life of a worker
+_DIR_CACHE = set()
+
+
+def _tile_dir(zoom_dir: Path, tile_x: int) -> Path:
+    """Return the directory of a tile column, creating it on first use.
+
+    Directories are remembered per process, so each one costs a single
+    makedirs call however many tiles are written to it.
+    """
+    x_dir = zoom_dir / str(tile_x)
+    if x_dir not in _DIR_CACHE:
+        os.makedirs(x_dir, exist_ok=True)
+        _DIR_CACHE.add(x_dir)
+    return x_dir
+
+
+def _level_edges(levels, vmin: float, vmax: float) -> np.ndarray:
+    """Return the contour level edges used for colouring.
 
-            # Create x directories
-            unique_x = set(tile.x for tile in tiles)
-            for x in unique_x:
-                (zoom_dir / str(x)).mkdir(exist_ok=True)
+    Parameters
+    ----------
+    levels : int or array_like
+        Number of levels between vmin and vmax, or the level values.
+    vmin : float
+        Minimum value for colormap.
+    vmax : float
+        Maximum value for colormap.
 
-            #vprint(f"Total tiles to generate: {len(tiles)}")
+    Returns
+    -------
+    numpy.ndarray
+        Increasing level values.
+    """
+    if not np.iterable(levels):
+        return np.linspace(vmin, vmax, levels)
+    return np.asarray(levels, dtype=np.float64)
 
-            # Process tiles in parallel
-            with ProcessPoolExecutor(max_workers=num_workers) as executor:
-                futures = {
-                    executor.submit(
-                        _generate_single_tile,
-                        tile.z, tile.x, tile.y,
-                        x_wm, y_wm, data_flat,
-                        str(output_path), cmap, levels, vmin, vmax,
-                        add_contour_lines, contour_levels
-                    ): (tile.x, tile.y) for tile in tiles
-                }
 
-                completed = 0
-                for future in tqdm(as_completed(futures), total=len(futures), desc="Tiles", leave=False):
-                    completed += 1
-                    #if completed % 100 == 0 or completed == len(tiles):
-                    #    vprint(f"Progress: {completed}/{len(tiles)} tiles", level=10)
+def _band_lut(cmap, levels, vmin: float, vmax: float) -> np.ndarray:
+    """Build an RGBA lookup table with one colour per contour band.
 
-                    try:
-                        future.result()
-                    except Exception as e:
-                        x, y = futures[future]
-                        print(f"Error generating tile {zoom}/{x}/{y}: {e}")
+    The colours match those of ``tricontourf(..., extend='both')``: each
+    band between two levels gets the colour of its midpoint, and values
+    below or above the levels get the end colours of the colormap.
+
+    Parameters
+    ----------
+    cmap : str or matplotlib.colors.Colormap
+        Colormap.
+    levels : int or array_like
+        Number of levels between vmin and vmax, or the level values.
+    vmin : float
+        Minimum value for colormap.
+    vmax : float
+        Maximum value for colormap.
+
+    Returns
+    -------
+    numpy.ndarray
+        (len(levels) + 1, 4) uint8 array of RGBA colours.
+    """
+    edges = _level_edges(levels, vmin, vmax)
+    values = np.concatenate([[vmin], (edges[:-1] + edges[1:]) / 2, [vmax]])
+    norm = matplotlib.colors.Normalize(vmin=vmin, vmax=vmax, clip=True)
+    colors = matplotlib.colormaps.get_cmap(cmap)(norm(values))
+    return np.round(colors * 255).astype(np.uint8)
 
-            #vprint(f"Completed zoom level {zoom}")
+
+def _band_colormap(cmap, levels, vmin: float, vmax: float):
+    """Build a colormap and norm that colour each contour band from a LUT.
+
+    Passing these to ``tricontourf`` gives the same colours as the
+    original colormap, but the band colours are looked up once per scene
+    instead of being evaluated on every tile.
+
+    Parameters
+    ----------
+    cmap : str or matplotlib.colors.Colormap
+        Colormap.
+    levels : int or array_like
+        Number of levels between vmin and vmax, or the level values.
+    vmin : float
+        Minimum value for colormap.
+    vmax : float
+        Maximum value for colormap.
+
+    Returns
+    -------
+    tuple
+        matplotlib.colors.ListedColormap and matplotlib.colors.BoundaryNorm.
+    """
+    edges = _level_edges(levels, vmin, vmax)
+    lut = _band_lut(cmap, edges, vmin, vmax) / 255
+    band_cmap = matplotlib.colors.ListedColormap(lut[1:-1])
+    band_cmap.set_under(lut[0])
+    band_cmap.set_over(lut[-1])
+    return band_cmap, matplotlib.colors.BoundaryNorm(edges, len(edges) - 1)
+
+
+def _tile_lonlat(zoom: int, tile_x: int, tile_y: int, size: int = 256):
+    """Return the longitudes and latitudes of the pixel centres of a tile.
+
+    Web Mercator is separable, so the pixel columns share longitudes and
+    the pixel rows share latitudes.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        Longitudes (west to east) and latitudes (north to south).
+    """
+    bounds = mercantile.xy_bounds(tile_x, tile_y, zoom)
+    frac = (np.arange(size) + 0.5) / size
+    x = bounds.left + frac * (bounds.right - bounds.left)
+    y = bounds.top - frac * (bounds.top - bounds.bottom)
+    lons = np.degrees(x / 6378137.0)
+    lats = np.degrees(2 * np.arctan(np.exp(y / 6378137.0)) - np.pi / 2)
+    return lons, lats
+
+
+def _grid_index(coords: np.ndarray, values: np.ndarray):
+    """Locate values on an increasing coordinate axis for interpolation.
+
+    The axis needs at least two coordinates.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        Index of the lower neighbour, weight of the upper neighbour, and a
+        mask of the values inside the axis.
+    """
+    pos = np.interp(values, coords, np.arange(len(coords)),
+                    left=np.nan, right=np.nan)
+    inside = ~np.isnan(pos)
+    pos = np.where(inside, pos, 0)
+    idx = np.minimum(pos.astype(np.intp), len(coords) - 2)
+    return idx, (pos - idx).astype(np.float32), inside
+
+
+def _gridded_tile_png(
+    zoom: int, tile_x: int, tile_y: int,
+    lats: np.ndarray, lons: np.ndarray, data: np.ndarray,
+    lut: np.ndarray, levels: np.ndarray
+) -> bytes:
+    """Render a single tile from a regular lat/lon grid to PNG bytes.
+
+    The grid is sampled bilinearly at the tile pixels and the values are
+    coloured by contour band with a lookup table. Pixels next to missing
+    data, or outside the grid, are transparent.
+
+    Parameters
+    ----------
+    zoom : int
+        Zoom level.
+    tile_x : int
+        Tile x coordinate.
+    tile_y : int
+        Tile y coordinate.
+    lats : numpy.ndarray
+        Increasing 1D latitudes of the grid.
+    lons : numpy.ndarray
+        Increasing 1D longitudes of the grid.
+    data : numpy.ndarray
+        2D (lat, lon) data values.
+    lut : numpy.ndarray
+        RGBA colour of each contour band, see :func:`_band_lut`.
+    levels : numpy.ndarray
+        Contour level edges.
+
+    Returns
+    -------
+    bytes
+        The encoded PNG tile.
+    """
+    TILE_SIZE = 256
+    if len(lons) < 2 or len(lats) < 2:
+        # A single row or column has no cells to interpolate in
+        return _empty_tile_png()
+    tile_lons, tile_lats = _tile_lonlat(zoom, tile_x, tile_y, TILE_SIZE)
+    ix, fx, x_inside = _grid_index(lons, tile_lons)
+    iy, fy, y_inside = _grid_index(lats, tile_lats)
+
+    if not (x_inside.any() and y_inside.any()):
+        return _empty_tile_png()
+    # Bilinear interpolation is separable: interpolate the grid rows under
+    # the tile to the pixel columns first, then blend those rows for each
+    # pixel row. Zoomed in, a tile covers few grid rows, so this avoids
+    # four full-tile gathers from the scene.
+    first = iy[y_inside].min()
+    band = data[first:iy[y_inside].max() + 2]
+    row_values = band[:, ix] * (1 - fx) + band[:, ix + 1] * fx
+    rows = np.clip(iy - first, 0, len(band) - 2)
+    fy = fy[:, None]
+    values = row_values[rows] * (1 - fy) + row_values[rows + 1] * fy
+    valid = ~np.isnan(values) & y_inside[:, None] & x_inside[None, :]
+    if not valid.any():
+        # For example a tile over land inside the data bounding box
+        return _empty_tile_png()
+    rgba = np.zeros((TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8)
+    bands = np.searchsorted(levels, values[valid], side="right")
+    rgba[valid] = lut[bands]
+    buf = io.BytesIO()
+    Image.fromarray(rgba, "RGBA").save(buf, **_PNG_OPTIONS)
+    return buf.getvalue()
+
+
+def _generate_gridded_tile(
+    zoom: int, tile_x: int, tile_y: int,
+    lats: np.ndarray, lons: np.ndarray, data: np.ndarray,
+    output_dir: str, lut: np.ndarray, levels: np.ndarray
+):
+    """Generate a single tile from a regular lat/lon grid.
+
+    Renders the tile with :func:`_gridded_tile_png` and writes it to
+    ``output_dir/zoom/x/y.png``. See there for the parameters.
+    """
+    tile_path = Path(output_dir) / str(zoom) / str(tile_x) / f"{tile_y}.png"
+    _write_tile(tile_path, _gridded_tile_png(zoom, tile_x, tile_y, lats, lons,
+                                            data, lut, levels))
+
+
+def _bucket_index(x: np.ndarray, y: np.ndarray, n: int = 256):
+    """Sort points into an n x n grid of buckets.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        x coordinates of the points.
+    y : numpy.ndarray
+        y coordinates of the points.
+    n : int, optional
+        Number of buckets along each axis, by default 256.
+
+    Returns
+    -------
+    order : numpy.ndarray
+        Permutation that sorts the points by bucket, row by row.
+    index : tuple
+        Bucket start offsets into the sorted points, followed by the grid
+        origin, bucket sizes, and n.
+    """
+    x0, y0 = float(x.min()), float(y.min())
+    sx = (float(x.max()) - x0) / n or 1.0
+    sy = (float(y.max()) - y0) / n or 1.0
+    bx = np.clip(((x - x0) / sx).astype(np.int64), 0, n - 1)
+    by = np.clip(((y - y0) / sy).astype(np.int64), 0, n - 1)
+    keys = by * n + bx
+    order = np.argsort(keys, kind="stable")
+    offsets = np.searchsorted(keys[order], np.arange(n * n + 1))
+    return order, (offsets, x0, y0, sx, sy, n)
+
+
+def _bucket_select(index, left: float, right: float,
+                   bottom: float, top: float) -> np.ndarray:
+    """Return the sorted point indices in the buckets overlapping a box.
+
+    The buckets of one row are contiguous in the sorted points, so each
+    row overlapping the box is a single slice.
+    """
+    offsets, x0, y0, sx, sy, n = index
+    bx0 = int(np.clip((left - x0) // sx, 0, n - 1))
+    bx1 = int(np.clip((right - x0) // sx, 0, n - 1))
+    by0 = int(np.clip((bottom - y0) // sy, 0, n - 1))
+    by1 = int(np.clip((top - y0) // sy, 0, n - 1))
+    return np.concatenate([np.arange(offsets[row * n + bx0], offsets[row * n + bx1 + 1])
+                           for row in range(by0, by1 + 1)])
+
+
+@functools.lru_cache(maxsize=1)
+def _tile_axes():
+    """Return the axes that triangulated tiles are drawn on.
+
+    The figure is created once per process, with the axes spanning the
+    whole figure so that it is rendered at exactly 256x256 pixels, and
+    is cleared between tiles instead of being rebuilt. It is not
+    registered with pyplot, so it never needs to be closed.
+    """
+    fig = Figure(figsize=(2.56, 2.56), dpi=100)
+    return fig.add_axes([0, 0, 1, 1])
+
+
+def _triangle_areas(x: np.ndarray, y: np.ndarray,
+                    triangles: np.ndarray) -> np.ndarray:
+    """Return the area of each triangle of a triangulation.
+
+    The vertex columns are gathered one at a time and combined in place,
+    so only a handful of (T,) arrays are allocated instead of the (T, 3)
+    vertex arrays and their edge differences.
+
+    Parameters
+    ----------
+    x, y : numpy.ndarray
+        Vertex coordinates.
+    triangles : numpy.ndarray
+        (T, 3) vertex indices of each triangle.
+
+    Returns
+    -------
+    numpy.ndarray
+        (T,) triangle areas.
+    """
+    a, b, c = triangles.T
+    xa, ya = x[a], y[a]
+    cross = x[b]
+    cross -= xa
+    dy = y[c]
+    dy -= ya
+    cross *= dy
+    dx = x[c]
+    dx -= xa
+    dy = y[b]
+    dy -= ya
+    dx *= dy
+    cross -= dx
+    np.abs(cross, out=cross)
+    cross *= 0.5
+    return cross
+
+
+def _grid_triangle_area(cell_size, y):
+    """Return the Web Mercator area of half a regular grid cell.
+
+    Parameters
+    ----------
+    cell_size : tuple of float
+        Longitude and latitude spacing of the grid in degrees.
+    y : float or numpy.ndarray
+        Web Mercator y coordinates, in meters, where the area is evaluated.
+
+    Returns
+    -------
+    float or numpy.ndarray
+        Area in square meters of a triangle spanning half a grid cell.
+    """
+    dlon, dlat = np.radians(cell_size)
+    lat = 2 * np.arctan(np.exp(np.asarray(y) / 6378137.0)) - np.pi / 2
+    # Web Mercator stretches both east-west and north-south distances by
+    # 1 / cos(lat)
+    return 0.5 * 6378137.0 ** 2 * dlon * dlat / np.cos(lat) ** 2
 
 
 def _generate_single_tile(
@@ -237,7 +776,8 @@ def _generate_single_tile(
     x_coords: np.ndarray, y_coords: np.ndarray, data: np.ndarray,
     output_dir: str, cmap: str, levels: int,
     vmin: float, vmax: float,
-    add_contour_lines: bool, contour_levels: int
+    add_contour_lines: bool, contour_levels: int, index=None, norm=None,
+    cell_size=None
 ):
     """Generate a single tile using Web Mercator coordinates.
 
@@ -269,6 +809,16 @@ def _generate_single_tile(
         Whether to add contour lines on top of filled contours.
     contour_levels : int
         Number of contour line levels.
+    index : tuple, optional
+        Bucket index of the points from :func:`_bucket_index`. If given,
+        only the points in the buckets around the tile are examined.
+    norm : matplotlib.colors.Normalize, optional
+        Normalization of the filled contours, by default a linear one
+        between vmin and vmax.
+    cell_size : tuple of float, optional
+        Longitude and latitude spacing in degrees of a regular source
+        grid. If given, gaps are detected from the expected triangle area
+        instead of the median area of the triangles in the tile.
     """
     TILE_SIZE = 256
     tile_path = Path(output_dir) / str(zoom) / str(tile_x) / f"{tile_y}.png"
@@ -289,6 +839,11 @@ def _generate_single_tile(
     buffered_bottom = y_bottom - buffer_y
     buffered_top = y_top + buffer_y
 
+    if index is not None:
+        sel = _bucket_select(index, buffered_left, buffered_right,
+                             buffered_bottom, buffered_top)
+        x_coords, y_coords, data = x_coords[sel], y_coords[sel], data[sel]
+
     # Filter data within tile bounds with buffer
     mask = (
         (x_coords >= buffered_left) & (x_coords <= buffered_right) &
@@ -296,8 +851,7 @@ def _generate_single_tile(
     )
 
     if not np.any(mask):
-        img = Image.new('RGBA', (TILE_SIZE, TILE_SIZE), (0, 0, 0, 0))
-        img.save(tile_path)
+        _write_tile(tile_path, _empty_tile_png())
         return
 
     tile_x_coords = x_coords[mask]
@@ -305,8 +859,7 @@ def _generate_single_tile(
     tile_data = data[mask]
 
     if len(tile_data) < 3:
-        img = Image.new('RGBA', (TILE_SIZE, TILE_SIZE), (0, 0, 0, 0))
-        img.save(tile_path)
+        _write_tile(tile_path, _empty_tile_png())
         return
 
     # Subsample if too many points to prevent OOM in triangulation
@@ -314,12 +867,15 @@ def _generate_single_tile(
     n_points_tile = len(tile_data)
     if n_points_tile > MAX_POINTS:
         step = n_points_tile // MAX_POINTS + 1
+        # The subsampled points are no longer on the source grid
+        cell_size = None
         tile_x_coords = tile_x_coords[::step]
         tile_y_coords = tile_y_coords[::step]
         tile_data = tile_data[::step]
 
-    # Create figure
-    fig, ax = plt.subplots(figsize=(TILE_SIZE / 100, TILE_SIZE / 100), dpi=100)
+    ax = _tile_axes()
+    fig = ax.figure
+    ax.cla()
     ax.set_xlim(x_left, x_right)
     ax.set_ylim(y_bottom, y_top)
     ax.axis('off')
@@ -328,23 +884,23 @@ def _generate_single_tile(
         triang = tri.Triangulation(tile_x_coords, tile_y_coords)
 
         # Mask large triangles (gaps in data)
-        triangles = triang.triangles
-        tri_x = triang.x[triangles]
-        tri_y = triang.y[triangles]
-
-        # Vectorized area calculation
-        areas = 0.5 * np.abs(
-            (tri_x[:, 1] - tri_x[:, 0]) * (tri_y[:, 2] - tri_y[:, 0]) -
-            (tri_x[:, 2] - tri_x[:, 0]) * (tri_y[:, 1] - tri_y[:, 0])
-        )
-        median_area = np.median(areas)
-        triang.set_mask(areas > 3 * median_area)
-        del tri_x, tri_y, areas
+        areas = _triangle_areas(triang.x, triang.y, triang.triangles)
+        if cell_size is None:
+            expected_area = np.median(areas)
+        else:
+            # Evaluated at the centroid of each triangle, the scale changes
+            # across tiles that span a wide latitude band
+            centroid_y = triang.y[triang.triangles].mean(axis=1)
+            expected_area = _grid_triangle_area(cell_size, centroid_y)
+        triang.set_mask(areas > 3 * expected_area)
+        del areas
 
         if not np.iterable(levels):
             levels = np.linspace(vmin, vmax, levels)
+        if norm is None:
+            norm = matplotlib.colors.Normalize(vmin=vmin, vmax=vmax)
         ax.tricontourf(triang, tile_data, levels=levels,
-                       cmap=cmap, vmin=vmin, vmax=vmax, extend='both')
+                       cmap=cmap, norm=norm, extend='both')
 
         if add_contour_lines and (zoom > 4):
             cs = ax.tricontour(triang, tile_data, levels=contour_levels,
@@ -354,24 +910,13 @@ def _generate_single_tile(
             ax.clabel(cs, inline=True, fontsize=8, fmt='%.1f')
 
     except Exception:
-        plt.close(fig)
-        img = Image.new('RGBA', (TILE_SIZE, TILE_SIZE), (0, 0, 0, 0))
-        img.save(tile_path)
+        _write_tile(tile_path, _empty_tile_png())
         return
 
-    plt.subplots_adjust(left=0, right=1, top=1, bottom=0, wspace=0, hspace=0)
-
     buf = io.BytesIO()
-    try:
-        plt.savefig(buf, format='png', transparent=True, pad_inches=0)
-    finally:
-        plt.close(fig)
-
-    buf.seek(0)
-    img = Image.open(buf)
-    img = img.resize((TILE_SIZE, TILE_SIZE), Image.LANCZOS)
-    img.save(tile_path)
-    buf.close()
+    fig.savefig(buf, format='png', transparent=True, dpi=100,
+                pil_kwargs=dict(compress_level=_PNG_OPTIONS["compress_level"]))
+    _write_tile(tile_path, buf.getvalue())
 
 
 def cruise_tiles(da, field_name, verbose=True):
@@ -385,14 +930,14 @@ def cruise_tiles(da, field_name, verbose=True):
         Whether to print progress messages, by default True.
     """
     dtm = pd.to_datetime(da.time.item())
-    settings.set("verbose", verbose)
+    set_verbose(verbose)
     generator = SlippyTileGenerator(
         min_lat=float(da.latitude.min()),
         max_lat=float(da.latitude.max()),
         min_lon=float(da.longitude.min()),
         max_lon=float(da.longitude.max())
     )
-    tile_base = pathlib.Path(settings["tile_dir"]) / field_name / str(dtm.date())
+    tile_base = Path(settings["tile_dir"]) / field_name / str(dtm.date())
     generator.generate_tiles(np.squeeze(da.data),
                              da.latitude.data,
                              da.longitude.data,
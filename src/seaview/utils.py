@@ -1,14 +1,28 @@
 
+from __future__ import annotations
+
+import atexit
+import datetime
+import functools
 import inspect
+import json
+import logging
+import pathlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from pyproj import Transformer
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-import numpy as np
 from typing import Tuple, Optional, List
 
 from . import config
 settings = config.settings
 
+_logger = logging.getLogger("seaview")
+
 
 class DataObjectError(BaseException):
     """Exception raised when the opening of a data object fails.
@@ -20,19 +34,278 @@ class DataObjectError(BaseException):
     pass
 
 
+class DateInFutureError(Exception):
+    """Exception raised when tiles are requested for a future date.
+
+    No data exists yet for dates after today, so the request is rejected
+    before any dataset is opened or downloaded.
+    """
+    pass
+
+
 
 def vprint(string, level=10):
-    frame = inspect.currentframe().f_back
-    name = frame.f_globals['__name__']
-    if settings.get("verbose") and (level>=3):
-        print(string)
+    """Log a progress message at DEBUG level.
+
+    The message is emitted on the logger of the calling module, so it is
+    shown when seaview logging is configured for debug output (see
+    :func:`seaview.config.config_log`). When debug output is disabled the
+    call returns after a single level check.
+
+    Messages built inside loops can be passed as a callable, for example
+    ``vprint(lambda: f"{name}: {value}")``, so that they are only
+    formatted when they are logged.
+
+    Parameters
+    ----------
+    string : str or callable
+        Message to log, or a function without arguments returning it.
+    level : int, optional
+        Verbosity level of the message, by default 10. Messages below
+        level 3 are never logged.
+    """
+    if (level>=3) and _logger.isEnabledFor(logging.DEBUG):
+        name = inspect.currentframe().f_back.f_globals['__name__']
+        logging.getLogger(name).debug(string() if callable(string) else string)
+
+
+def set_verbose(verbose):
+    """Show or hide the progress messages of :func:`vprint`.
+
+    Sets the ``verbose`` setting and the level of the seaview logger:
+    DEBUG when verbose, otherwise the ``log_level`` setting (default
+    "INFO"). When logging has not been configured, for example when
+    seaview is used as a library without :func:`seaview.config.config_log`,
+    a handler printing to stderr is added so that the messages are shown.
+
+    Parameters
+    ----------
+    verbose : bool
+        Show progress messages.
+    """
+    settings.set("verbose", bool(verbose))
+    level = "DEBUG" if verbose else str(settings.get("log_level", "INFO")).upper()
+    _logger.setLevel(level)
+    if verbose and not (logging.getLogger().handlers or _logger.handlers):
+        logging.basicConfig(format='%(levelname)s:%(message)s')
+
+
+@functools.lru_cache(maxsize=512)
+def _parse_day(dtm):
+    if isinstance(dtm, str):
+        try:
+            dtm = datetime.datetime.fromisoformat(dtm.replace("/", "-"))
+        except ValueError:
+            # Formats the standard library does not parse
+            import pandas as pd
+            dtm = pd.to_datetime(dtm)
+    elif not isinstance(dtm, datetime.date):
+        # numpy datetime64 and other date-like objects
+        import pandas as pd
+        dtm = pd.to_datetime(dtm)
+    if isinstance(dtm, datetime.datetime):
+        if dtm.tzinfo is not None:
+            dtm = dtm.astimezone(datetime.timezone.utc)
+        dtm = dtm.date()
+    return dtm.isoformat()
+
+
+def iso_day(dtm):
+    """Return the UTC day of a date as an ISO date string.
+
+    Times with a timezone are converted to UTC first, naive times are
+    taken as they are. Date strings are parsed once and remembered, since
+    the same date is parsed for every filename, download, and tile
+    directory of a day.
+
+    Parameters
+    ----------
+    dtm : str or datetime-like
+        The date.
+
+    Returns
+    -------
+    str
+        The day as YYYY-MM-DD.
+    """
+    if isinstance(dtm, str):
+        return _parse_day(dtm)
+    return _parse_day.__wrapped__(dtm)
+
+
+def find_ssh_key():
+    """Find the ssh key used to sync files to the remote server.
+
+    The key ``sea_id_ed25519`` is looked for in the current directory,
+    in ``~/.ssh``, and in ``~/.config/seaview``, in that order.
+
+    Returns
+    -------
+    pathlib.Path or None
+        Path to the key file, or None if no key file was found.
+    """
+    for key in (pathlib.Path.cwd() / "sea_id_ed25519",
+                pathlib.Path.home() / ".ssh/sea_id_ed25519",
+                pathlib.Path.home() / ".config/seaview/sea_id_ed25519"):
+        if key.is_file():
+            return key
+    _logger.warning("Can't find an ssh key file, will use the default.")
+    return None
+
+
+def rsync_rsh(key=None):
+    """Return the rsync options that run ssh over a shared connection.
+
+    The ssh connection is kept open for a minute after a transfer, so
+    that the tile and layer config uploads reuse a single connection.
+
+    Parameters
+    ----------
+    key : str or pathlib.Path, optional
+        Private key file passed to ssh.
+
+    Returns
+    -------
+    list of str
+        ``--rsh`` and its ssh command, as separate arguments. sysrsync
+        runs rsync without a shell, so the command is not quoted.
+    """
+    args = ["ssh"]
+    if key is not None:
+        args += ["-i", str(key)]
+    args += ["-o", "ControlMaster=auto",
+             "-o", "ControlPath=/tmp/seaview-ssh-%r@%h:%p",
+             "-o", "ControlPersist=60s"]
+    return ["--rsh", " ".join(args)]
+
+
+def json_loads(data):
+    """Decode a JSON document, with orjson when it is installed.
 
+    Parameters
+    ----------
+    data : bytes or str
+        The JSON document.
+
+    Returns
+    -------
+    object
+        The decoded document.
+
+    Raises
+    ------
+    ValueError
+        If the document is not valid JSON.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_default(obj):
+    """Convert numpy arrays and scalars for the standard json module."""
+    # numpy arrays and scalars, without importing numpy
+    if type(obj).__module__ == "numpy" and hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def json_dumps(obj):
+    """Encode an object as indented JSON, with orjson when it is installed.
+
+    Parameters
+    ----------
+    obj : object
+        The object to encode. numpy arrays and scalars are supported.
+
+    Returns
+    -------
+    bytes
+        The JSON document indented by two spaces.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, indent=2, default=_json_default).encode()
+
+
+_background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="seaview-sync")
+_background_jobs = []
+_background_lock = threading.Lock()
+
+
+def run_in_background(func, *args, **kwargs):
+    """Queue a function, typically an upload, to run in the background.
+
+    Jobs run one at a time in the order they were queued, so uploads do
+    not compete for the connection and a layer config queued after the
+    tiles is uploaded after them. A job identical to the last one still
+    waiting in the queue is not queued twice.
+
+    Parameters
+    ----------
+    func : callable
+        Function to run.
+    *args, **kwargs
+        Arguments passed to the function.
+
+    Returns
+    -------
+    concurrent.futures.Future
+        Future of the queued job.
+    """
+    key = (func, args, tuple(sorted(kwargs.items())))
+    with _background_lock:
+        if _background_jobs:
+            last_key, last_future = _background_jobs[-1]
+            if last_key == key and not (last_future.running() or last_future.done()):
+                return last_future
+        future = _background.submit(func, *args, **kwargs)
+        _background_jobs.append((key, future))
+    return future
+
+
+def wait_for_background():
+    """Wait for all queued background jobs to finish.
+
+    Raises
+    ------
+    RuntimeError
+        If any of the jobs failed.
+    """
+    with _background_lock:
+        jobs = list(_background_jobs)
+        _background_jobs.clear()
+    failed = []
+    for (func, args, _), future in jobs:
+        try:
+            future.result()
+        except Exception as e:
+            _logger.warning("Background job %s%s failed: %s", func.__name__, args, e)
+            failed.append(func.__name__)
+    if failed:
+        raise RuntimeError(f"Background jobs failed: {', '.join(failed)}")
+
+
+atexit.register(wait_for_background)
+
+
+# Web Mercator transformer (lon/lat to x/y meters) of each thread. pyproj
+# transformers should not be shared between threads. numpy and pyproj are
+# imported by the functions that use them, so that importing seaview for
+# the CLI does not load them.
+_transformer_local = threading.local()
+
+
+def _get_transformer():
+    """Return the Web Mercator transformer of the current thread."""
+    transformer = getattr(_transformer_local, "transformer", None)
+    if transformer is None:
+        from pyproj import Transformer
+        transformer = Transformer.from_crs("EPSG:4326", "EPSG:3857", always_xy=True)
+        _transformer_local.transformer = transformer
+    return transformer
 
 
-# Web Mercator transformer (lon/lat to x/y meters)
-_transformer_to_webmerc = Transformer.from_crs(
-    "EPSG:4326", "EPSG:3857", always_xy=True
-)
 def lonlat_to_webmercator(lons: np.ndarray, lats: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     """Transform longitude/latitude arrays to Web Mercator coordinates.
 
@@ -48,5 +321,36 @@ def lonlat_to_webmercator(lons: np.ndarray, lats: np.ndarray) -> Tuple[np.ndarra
     tuple of numpy.ndarray
         (x, y) coordinates in Web Mercator meters.
     """
-    x, y = _transformer_to_webmerc.transform(lons, lats)
+    import numpy as np
+    # PROJ works in double precision. Transforming float64 copies of the
+    # inputs in place saves pyproj a buffer copy of each array.
+    x = np.array(lons, dtype=np.float64)
+    y = np.array(lats, dtype=np.float64)
+    _get_transformer().transform(x, y, inplace=True)
     return x.astype(np.float32), y.astype(np.float32)
+
+
+def lonlat_to_webmercator_separable(lons_1d: np.ndarray,
+                                    lats_1d: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Transform the axes of a regular lon/lat grid to Web Mercator.
+
+    Web Mercator x only depends on longitude and y only on latitude, so
+    the axes of a grid can be transformed separately, instead of every
+    grid point.
+
+    Parameters
+    ----------
+    lons_1d : numpy.ndarray
+        Longitude axis in degrees.
+    lats_1d : numpy.ndarray
+        Latitude axis in degrees.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        x axis and y axis in Web Mercator meters.
+    """
+    import numpy as np
+    x, _ = lonlat_to_webmercator(lons_1d, np.zeros_like(lons_1d))
+    _, y = lonlat_to_webmercator(np.zeros_like(lats_1d), lats_1d)
+    return x, y
@@ -46,6 +46,15 @@ class TestUpdateCommand:
         result_no_sync = runner.invoke(app, ["update", "--no-sync"])
         assert result_no_sync.exit_code == 0
 
+    @patch('seaview.utils.wait_for_background',
+           side_effect=RuntimeError("Background jobs failed: sync"))
+    def test_failed_upload_sets_exit_code(self, mock_wait):
+        """update command should exit non-zero when a background upload failed."""
+        result = runner.invoke(app, ["update", "--no-sync"])
+
+        mock_wait.assert_called_once()
+        assert result.exit_code == 1
+
 
 class TestShootCommand:
     """Tests for the shoot CLI command."""
@@ -10,6 +10,155 @@ import xarray as xr
 import numpy as np
 
 from seaview.data_sources import cmems_ssh, ostia, globcolour, gebco_bathy
+from seaview.data_sources.copernicus import CopernicusSource
+
+
+class TestCopernicusSource:
+    """Tests for the CopernicusSource class."""
+
+    def _source(self):
+        return CopernicusSource(dataset_id="test-dataset", name="TEST",
+                                subdir="copernicus/TEST", data_var="var",
+                                title="Test")
+
+    def test_filename_format(self):
+        """filename should use the product name."""
+        assert self._source().filename("2025-06-15") == "copernicus_TEST_2025-06-15.nc"
+
+    def test_modules_share_the_source_methods(self):
+        """The data source modules should expose their source's methods."""
+        assert cmems_ssh.open_dataset == cmems_ssh.source.open_dataset
+        assert ostia.retrieve == ostia.source.retrieve
+        assert globcolour.source.dataset_id == globcolour.DATASET_ID
+
+    @patch('copernicusmarine.subset')
+    def test_retrieve_range_skips_existing_files(self, mock_subset):
+        """retrieve_range should not download when all daily files exist."""
+        source = self._source()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch.object(CopernicusSource, 'datadir', return_value=Path(tmpdir)):
+                for day in ("2025-06-14", "2025-06-15"):
+                    (Path(tmpdir) / source.filename(day)).touch()
+
+                source.retrieve_range("2025-06-14", "2025-06-15")
+
+            mock_subset.assert_not_called()
+
+    @patch('seaview.data_sources.copernicus.split_days')
+    @patch('copernicusmarine.subset')
+    def test_retrieve_range_clips_to_dataset_coverage(self, mock_subset, mock_split):
+        """retrieve_range should not fail on dates the dataset does not have."""
+        source = self._source()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch.object(CopernicusSource, 'datadir', return_value=Path(tmpdir)):
+                source.retrieve_range("2025-06-14", "2025-06-15")
+
+        mock_subset.assert_called_once()
+        assert mock_subset.call_args[1]["coordinates_selection_method"] == "inside"
+        mock_split.assert_called_once()
+
+    def test_split_days_writes_only_missing_dates(self):
+        """split_days should leave existing daily files untouched."""
+        from seaview.data_sources.utils import split_days
+        source = self._source()
+        times = pd.date_range("2025-06-14", "2025-06-16")
+        ds = xr.Dataset({"var": (("time", "x"), np.ones((3, 2)))},
+                        coords={"time": times})
+        with tempfile.TemporaryDirectory() as tmpdir:
+            datadir = Path(tmpdir)
+            bulk_fn = datadir / "bulk.nc"
+            ds.to_netcdf(bulk_fn, engine="h5netcdf")
+            existing = datadir / source.filename("2025-06-15")
+            existing.write_bytes(b"keep")
+
+            split_days(bulk_fn, datadir, source.filename,
+                       pd.DatetimeIndex(["2025-06-14", "2025-06-16"]))
+
+            assert existing.read_bytes() == b"keep"
+            assert (datadir / source.filename("2025-06-14")).is_file()
+            assert (datadir / source.filename("2025-06-16")).is_file()
+            assert not bulk_fn.exists()
+            assert not list(datadir.glob("*.tmp"))
+
+    @patch.object(CopernicusSource, '_subset')
+    def test_forced_retrieve_downloads_again(self, mock_subset):
+        """retrieve(force=True) should replace an existing file."""
+        source = self._source()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch.object(CopernicusSource, 'datadir', return_value=Path(tmpdir)):
+                fn = Path(tmpdir) / source.filename("2025-06-15")
+                fn.touch()
+                source.retrieve("2025-06-15", force=True)
+
+            mock_subset.assert_called_once()
+
+    @patch('time.sleep')
+    @patch('xarray.open_dataset', side_effect=OSError("locked"))
+    def test_open_dataset_gives_up_after_retries(self, mock_open, mock_sleep):
+        """open_dataset should retry a failing open and then raise OSError."""
+        source = self._source()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch.object(CopernicusSource, 'datadir', return_value=Path(tmpdir)):
+                (Path(tmpdir) / source.filename("2025-06-15")).touch()
+                with pytest.raises(OSError, match="after 4 attempts"):
+                    source.open_dataset("2025-06-15")
+        assert mock_open.call_count == CopernicusSource.OPEN_ATTEMPTS
+        assert mock_sleep.call_count == CopernicusSource.OPEN_ATTEMPTS - 1
+
+    def test_open_dataset_streams_missing_file(self):
+        """open_dataset should stream uncached data when stream_data is set."""
+        from seaview.data_sources import copernicus
+        source = self._source()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch.object(CopernicusSource, 'datadir', return_value=Path(tmpdir)), \
+                 patch.object(copernicus.settings, 'get',
+                              side_effect=lambda k, d=None: k == "stream_data" or d), \
+                 patch.object(CopernicusSource, 'open_remote') as mock_remote, \
+                 patch.object(CopernicusSource, 'retrieve') as mock_retrieve:
+                ds = source.open_dataset("2025-06-15")
+            assert ds is mock_remote.return_value
+            mock_retrieve.assert_not_called()
+
+
+    @patch('copernicusmarine.open_dataset')
+    def test_open_multiday_opens_range_once(self, mock_open):
+        """open_multiday should request the whole range in one call."""
+        from datetime import datetime, timezone
+        from seaview.data_sources import copernicus
+        source = self._source()
+        with patch.object(copernicus, 'settings', MagicMock()):
+            source.open_multiday("2025-06-14", "2025-06-16")
+        mock_open.assert_called_once()
+        kwargs = mock_open.call_args[1]
+        assert kwargs["start_datetime"] == datetime(2025, 6, 14, tzinfo=timezone.utc)
+        assert kwargs["end_datetime"] == datetime(2025, 6, 16, 23, 59, 59,
+                                                  tzinfo=timezone.utc)
+
+
+class TestMaskAndScale:
+    """Tests for decoding raw Copernicus variables."""
+
+    def test_applies_fill_scale_and_offset(self):
+        """_mask_and_scale should mask fill values and scale the rest."""
+        from seaview.data_sources.copernicus import _mask_and_scale
+        raw = xr.DataArray(np.array([-32768, 0, 100], dtype=np.int16),
+                           attrs=dict(_FillValue=-32768, scale_factor=0.01,
+                                      add_offset=273.15, units="kelvin"))
+        result = _mask_and_scale(raw)
+        assert result.dtype == np.float32
+        assert np.isnan(result[0])
+        np.testing.assert_allclose(result[1:], [273.15, 274.15], rtol=1e-6)
+        assert result.attrs == {"units": "kelvin"}
+
+    def test_applies_missing_value_and_unsigned(self):
+        """_mask_and_scale should mask missing_value and read _Unsigned bytes."""
+        from seaview.data_sources.copernicus import _mask_and_scale
+        raw = xr.DataArray(np.array([-1, -56, 5, 7], dtype=np.int8),
+                           attrs=dict(_Unsigned="true", _FillValue=np.int8(-1),
+                                      missing_value=np.int8(7)))
+        result = _mask_and_scale(raw)
+        assert np.isnan(result[0]) and np.isnan(result[3])
+        np.testing.assert_array_equal(result[1:3], [200, 5])
 
 
 class TestCmemsSSH:
@@ -225,59 +374,79 @@ class TestGebcoBathy:
 
 
 class TestVerbosePrint:
-    """Tests for the vprint functions in data source modules."""
+    """Tests for vprint as used by the data source modules."""
 
-    def test_cmems_ssh_vprint(self, capsys):
-        """cmems_ssh.vprint should print when VERBOSE is True."""
-        original = cmems_ssh.VERBOSE
-        try:
-            cmems_ssh.VERBOSE = True
+    def test_cmems_ssh_vprint(self, caplog):
+        """vprint should log at DEBUG on the calling module's logger."""
+        with caplog.at_level("DEBUG", logger="seaview"):
             cmems_ssh.vprint("test message")
-            captured = capsys.readouterr()
-            assert "test message" in captured.out
-        finally:
-            cmems_ssh.VERBOSE = original
+        assert "test message" in caplog.text
 
-    def test_cmems_ssh_vprint_silent(self, capsys):
-        """cmems_ssh.vprint should be silent when VERBOSE is False."""
-        original = cmems_ssh.VERBOSE
-        try:
-            cmems_ssh.VERBOSE = False
+    def test_cmems_ssh_vprint_silent(self, caplog, capsys):
+        """vprint should neither print nor log above DEBUG level."""
+        with caplog.at_level("INFO", logger="seaview"):
             cmems_ssh.vprint("test message")
-            captured = capsys.readouterr()
-            assert captured.out == ""
-        finally:
-            cmems_ssh.VERBOSE = original
-
-    def test_ostia_vprint(self, capsys):
-        """ostia.vprint should print when VERBOSE is True."""
-        original = ostia.VERBOSE
+        assert "test message" not in caplog.text
+        assert capsys.readouterr().out == ""
+
+    def test_low_level_is_never_logged(self, caplog):
+        """vprint should ignore messages below level 3."""
+        with caplog.at_level("DEBUG", logger="seaview"):
+            ostia.vprint("test message", level=2)
+        assert "test message" not in caplog.text
+
+    def test_callable_message_is_only_called_when_logged(self, caplog):
+        """vprint should only build a callable message at DEBUG level."""
+        message = MagicMock(return_value="lazy message")
+        with caplog.at_level("INFO", logger="seaview"):
+            ostia.vprint(message)
+        message.assert_not_called()
+        with caplog.at_level("DEBUG", logger="seaview"):
+            ostia.vprint(message)
+        assert "lazy message" in caplog.text
+
+    def test_set_verbose_shows_progress_messages(self):
+        """set_verbose should switch the seaview logger to DEBUG and back."""
+        from seaview import utils
+        logger = utils._logger
+        level = logger.level
         try:
-            ostia.VERBOSE = True
-            ostia.vprint("test message")
-            captured = capsys.readouterr()
-            assert "test message" in captured.out
+            with patch.object(utils, 'settings', MagicMock(get=lambda k, d=None: d)):
+                utils.set_verbose(True)
+                assert logger.isEnabledFor(10)
+                utils.set_verbose(False)
+                assert not logger.isEnabledFor(10)
         finally:
-            ostia.VERBOSE = original
+            logger.setLevel(level)
 
-    def test_globcolour_vprint(self, capsys):
-        """globcolour.vprint should print when VERBOSE is True."""
-        original = globcolour.VERBOSE
-        try:
-            globcolour.VERBOSE = True
-            globcolour.vprint("test message")
-            captured = capsys.readouterr()
-            assert "test message" in captured.out
-        finally:
-            globcolour.VERBOSE = original
+    def test_gebco_uses_shared_vprint(self):
+        """gebco_bathy should use the shared vprint helper."""
+        from seaview import utils
+        assert gebco_bathy.vprint is utils.vprint
+        assert not hasattr(gebco_bathy, "VERBOSE")
 
-    def test_gebco_vprint(self, capsys):
-        """gebco_bathy.vprint should print when VERBOSE is True."""
-        original = gebco_bathy.VERBOSE
-        try:
-            gebco_bathy.VERBOSE = True
-            gebco_bathy.vprint("test message")
-            captured = capsys.readouterr()
-            assert "test message" in captured.out
-        finally:
-            gebco_bathy.VERBOSE = original
+
+class TestDayBounds:
+    """Tests for the day_bounds helper."""
+
+    def test_bounds_cover_the_day(self):
+        """day_bounds should span the first to the last second of the day."""
+        from datetime import datetime, timezone
+        from seaview.data_sources.utils import day_bounds
+
+        start, end = day_bounds("2025-06-15")
+        assert start == datetime(2025, 6, 15, tzinfo=timezone.utc)
+        assert end == datetime(2025, 6, 15, 23, 59, 59, tzinfo=timezone.utc)
+
+
+class TestIsoDay:
+    """Tests for the iso_day helper."""
+
+    def test_accepts_strings_and_datetimes(self):
+        """iso_day should give the same day for strings and datetimes."""
+        from datetime import datetime
+        from seaview.data_sources.utils import iso_day
+
+        assert iso_day("2025-06-15") == "2025-06-15"
+        assert iso_day(datetime(2025, 6, 15, 12)) == "2025-06-15"
+        assert iso_day(pd.Timestamp("2025-06-15")) == "2025-06-15"
@@ -1,9 +1,9 @@
 """Tests for the seaview package __init__ module."""
 
-from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
 from unittest.mock import patch, MagicMock
 
-import pandas as pd
 import pytest
 
 import seaview
@@ -23,6 +23,20 @@ class TestDateInFutureError:
             raise DateInFutureError("Date is in the future")
 
 
+class TestImport:
+    """Tests for the cost of importing the package."""
+
+    def test_import_skips_heavy_modules(self):
+        """Importing seaview should not load numpy, pandas, or pyproj."""
+        import subprocess
+        import sys
+        code = ("import sys, seaview; "
+                "print(sorted({'numpy', 'pandas', 'pyproj', 'sysrsync'} & set(sys.modules)))")
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True,
+                                text=True, check=True)
+        assert result.stdout.strip() == "[]"
+
+
 class TestDay:
     """Tests for the day function."""
 
@@ -55,8 +69,8 @@ class TestToday:
         # Should call tile.all with today's date
         assert mock_all.called
         call_args = mock_all.call_args[0][0]
-        assert isinstance(call_args, pd.Timestamp)
-        assert call_args.date() == pd.Timestamp.now().normalize().date()
+        assert isinstance(call_args, date)
+        assert call_args == date.today()
 
     @patch.object(seaview.layer_config, 'sync')
     @patch.object(seaview.tile, 'sync')
@@ -67,6 +81,7 @@ class TestToday:
         mock_settings.get = MagicMock(return_value=True)
 
         seaview.today(force=False, sync=True)
+        seaview.utils.wait_for_background()
 
         mock_tile_sync.assert_called_once()
         mock_layer_sync.assert_called_once()
@@ -101,9 +116,8 @@ class TestYesterday:
         # Should call tile.all with yesterday's date
         assert mock_all.called
         call_args = mock_all.call_args[0][0]
-        assert isinstance(call_args, pd.Timestamp)
-        expected_date = (pd.Timestamp.now().normalize() - pd.Timedelta(1, "D")).date()
-        assert call_args.date() == expected_date
+        assert isinstance(call_args, date)
+        assert call_args == date.today() - timedelta(days=1)
 
     @patch.object(seaview.layer_config, 'sync')
     @patch.object(seaview.tile, 'sync')
@@ -114,6 +128,7 @@ class TestYesterday:
         mock_settings.get = MagicMock(return_value=True)
 
         seaview.yesterday(force=False, sync=True)
+        seaview.utils.wait_for_background()
 
         mock_tile_sync.assert_called_once()
         mock_layer_sync.assert_called_once()
@@ -122,11 +137,14 @@ class TestYesterday:
 class TestLastDays:
     """Tests for the last_days function."""
 
+    @patch.object(seaview.tile, '_process_pool', ThreadPoolExecutor)
+    @patch.object(seaview.tile, 'prefetch')
     @patch.object(seaview.layer_config, 'sync')
     @patch.object(seaview.tile, 'sync')
     @patch.object(seaview.tile, 'all')
     @patch.object(seaview.config, 'settings')
-    def test_processes_multiple_days(self, mock_settings, mock_all, mock_tile_sync, mock_layer_sync):
+    def test_processes_multiple_days(self, mock_settings, mock_all, mock_tile_sync, mock_layer_sync,
+            mock_prefetch):
         """last_days should process the specified number of days."""
         mock_settings.get = MagicMock(return_value=False)
 
@@ -136,11 +154,14 @@ class TestLastDays:
         # days=3 means 4 calls: today, yesterday, day before yesterday, 3 days ago
         assert mock_all.call_count >= 3
 
+    @patch.object(seaview.tile, '_process_pool', ThreadPoolExecutor)
+    @patch.object(seaview.tile, 'prefetch')
     @patch.object(seaview.layer_config, 'sync')
     @patch.object(seaview.tile, 'sync')
     @patch.object(seaview.tile, 'all')
     @patch.object(seaview.config, 'settings')
-    def test_default_days_is_seven(self, mock_settings, mock_all, mock_tile_sync, mock_layer_sync):
+    def test_default_days_is_seven(self, mock_settings, mock_all, mock_tile_sync, mock_layer_sync,
+            mock_prefetch):
         """last_days should default to 7 days."""
         mock_settings.get = MagicMock(return_value=False)
 
@@ -149,11 +170,14 @@ class TestLastDays:
         # Should call tile.all for 8 days (7 days back + today)
         assert mock_all.call_count >= 7
 
+    @patch.object(seaview.tile, '_process_pool', ThreadPoolExecutor)
+    @patch.object(seaview.tile, 'prefetch')
     @patch.object(seaview.layer_config, 'sync')
     @patch.object(seaview.tile, 'sync')
     @patch.object(seaview.tile, 'all')
     @patch.object(seaview.config, 'settings')
-    def test_syncs_when_enabled(self, mock_settings, mock_all, mock_tile_sync, mock_layer_sync):
+    def test_syncs_when_enabled(self, mock_settings, mock_all, mock_tile_sync, mock_layer_sync,
+            mock_prefetch):
         """last_days should sync when remote_sync is enabled."""
         mock_settings.get = MagicMock(return_value=True)
 
@@ -197,3 +221,72 @@ class TestPackageExports:
         """seaview.last_days should be accessible."""
         assert hasattr(seaview, 'last_days')
         assert callable(seaview.last_days)
+
+
+class TestDeferredSync:
+    """Tests for the deferred_sync context manager."""
+
+    @patch.object(seaview.layer_config, 'sync')
+    @patch.object(seaview.tile, 'sync')
+    def test_syncs_layer_config_once(self, mock_tile_sync, mock_layer_sync):
+        """deferred_sync should sync each date and the layer config once."""
+        with seaview.deferred_sync():
+            seaview._queue_sync(date(2026, 1, 2))
+            seaview._queue_sync(date(2026, 1, 1))
+            mock_tile_sync.assert_not_called()
+        seaview.utils.wait_for_background()
+
+        assert mock_tile_sync.call_count == 2
+        mock_layer_sync.assert_called_once()
+
+
+class TestRunInBackground:
+    """Tests for the background job queue used for syncing."""
+
+    def test_runs_jobs_in_order(self):
+        """Queued jobs should run one at a time in queue order."""
+        calls = []
+        seaview.utils.run_in_background(calls.append, "tiles")
+        seaview.utils.run_in_background(calls.append, "layer_config")
+        seaview.utils.wait_for_background()
+
+        assert calls == ["tiles", "layer_config"]
+
+    def test_reports_failed_jobs(self):
+        """wait_for_background should raise if a job failed."""
+        def fail():
+            raise OSError("no connection")
+
+        seaview.utils.run_in_background(fail)
+        with pytest.raises(RuntimeError):
+            seaview.utils.wait_for_background()
+
+    @patch.object(seaview.tile, '_process_pool', ThreadPoolExecutor)
+    @patch.object(seaview.tile, '_tile_workers', return_value=8)
+    @patch.object(seaview.tile, 'prefetch')
+    @patch.object(seaview, '_render_one_day', return_value=False)
+    @patch.object(seaview, 'settings')
+    def test_splits_tile_workers_between_days(self, mock_settings, mock_render, mock_prefetch,
+            mock_tile_workers):
+        """last_days should share the tile worker budget between parallel days."""
+        mock_settings.get.side_effect = lambda key, default=None: {"day_workers": 2}.get(key, default)
+
+        seaview.last_days(days=3, sync=False)
+
+        assert mock_render.call_count == 4
+        assert all(call.args[1] == 4 for call in mock_render.call_args_list)
+
+    @patch.object(seaview.tile, '_process_pool')
+    @patch.object(seaview.tile, '_tile_workers', return_value=4)
+    @patch.object(seaview.tile, 'prefetch')
+    @patch.object(seaview, 'settings')
+    @patch('os.cpu_count', return_value=12)
+    def test_days_run_in_parallel_by_default(self, mock_cpu_count, mock_settings,
+            mock_prefetch, mock_tile_workers, mock_pool):
+        """last_days should process several days at once without day_workers."""
+        mock_settings.get.return_value = None
+        mock_pool.return_value.__enter__.return_value.map.return_value = []
+
+        seaview.last_days(days=7, sync=False)
+
+        mock_pool.assert_called_once_with(4)
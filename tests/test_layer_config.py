@@ -216,6 +216,26 @@ class TestUpdateDateRanges:
             assert ssh_layer["date_range"]["start"] == "2025-05-01"
             assert ssh_layer["date_range"]["end"] == "2025-05-15"
 
+    def test_skips_write_when_dates_unchanged(self):
+        """update_date_ranges should not rewrite a file with the same dates."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            json_path = self._create_test_json(tmpdir)
+            layer_dates = {"ssh": {"start": "2025-02-01", "end": "2025-02-15"}}
+            layer_config.update_date_ranges(json_path, layer_dates=layer_dates)
+
+            with patch.object(layer_config.os, "replace") as mock_replace:
+                layer_config.update_date_ranges(json_path, layer_dates=layer_dates)
+            mock_replace.assert_not_called()
+
+    def test_leaves_no_temporary_file(self):
+        """update_date_ranges should replace the file without leftovers."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            json_path = self._create_test_json(tmpdir)
+            layer_dates = {"ssh": {"start": "2025-02-01", "end": "2025-02-15"}}
+            layer_config.update_date_ranges(json_path, layer_dates=layer_dates)
+
+            assert sorted(p.name for p in Path(tmpdir).iterdir()) == ["test_config.json"]
+
     def test_handles_empty_layer_dates(self):
         """update_date_ranges should handle None or empty layer_dates."""
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -256,28 +276,78 @@ class TestFindFirstLastTileDates:
             assert "start" in result["ssh"]
             assert "end" in result["ssh"]
 
+    @patch.object(layer_config, 'settings')
+    def test_ignores_files_in_layer_dir(self, mock_settings):
+        """find_first_last_tile_dates should only consider date directories."""
+        from datetime import date
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ssh_dir = Path(tmpdir) / "ssh"
+            ssh_dir.mkdir()
+            (ssh_dir / "2025-01-01").mkdir()
+            (ssh_dir / "2025-01-10").mkdir()
+            (ssh_dir / "index.html").touch()
+
+            mock_settings.__getitem__ = MagicMock(return_value=tmpdir)
+            mock_settings.get = MagicMock(side_effect=lambda k: {
+                "updated_tiles": ["ssh"],
+                "max_tile_days": 30
+            }.get(k))
+
+            result = layer_config.find_first_last_tile_dates()
+
+            assert result["ssh"] == dict(start=date(2025, 1, 1), end=date(2025, 1, 10))
+
+    @patch.object(layer_config, 'settings')
+    def test_skips_layers_without_tiles(self, mock_settings):
+        """find_first_last_tile_dates should leave out missing or empty layers."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            (Path(tmpdir) / "ssh").mkdir()
+
+            mock_settings.__getitem__ = MagicMock(return_value=tmpdir)
+            mock_settings.get = MagicMock(side_effect=lambda k: {
+                "updated_tiles": ["ssh", "ostia"],
+                "max_tile_days": 30
+            }.get(k))
+
+            assert layer_config.find_first_last_tile_dates() == {}
+
+    @patch.object(layer_config, 'settings')
+    def test_reuses_scan_of_unchanged_layer(self, mock_settings):
+        """find_first_last_tile_dates should not rescan an unchanged layer."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ssh_dir = Path(tmpdir) / "tiles" / "ssh"
+            ssh_dir.mkdir(parents=True)
+            (ssh_dir / "2025-01-01").mkdir()
+            (ssh_dir / "2025-01-10").mkdir()
+
+            mock_settings.__getitem__ = MagicMock(return_value=Path(tmpdir) / "tiles")
+            mock_settings.get = MagicMock(side_effect=lambda k: {
+                "updated_tiles": ["ssh"],
+                "max_tile_days": 30
+            }.get(k))
+
+            with patch.object(layer_config, '_DATES_CACHE', Path(tmpdir) / "cache.json"):
+                first = layer_config.find_first_last_tile_dates()
+                with patch.object(layer_config, '_tile_date_names') as mock_scan:
+                    second = layer_config.find_first_last_tile_dates()
+
+            mock_scan.assert_not_called()
+            assert first == second
+
 
 class TestVprint:
     """Tests for the vprint helper function."""
 
-    def test_prints_when_verbose_true(self, capsys):
-        """vprint should print when VERBOSE is True."""
-        original_verbose = layer_config.VERBOSE
-        try:
-            layer_config.VERBOSE = True
+    def test_logs_at_debug_level(self, caplog):
+        """vprint should log the message when DEBUG is enabled."""
+        with caplog.at_level("DEBUG", logger="seaview"):
             layer_config.vprint("test message")
-            captured = capsys.readouterr()
-            assert "test message" in captured.out
-        finally:
-            layer_config.VERBOSE = original_verbose
-
-    def test_silent_when_verbose_false(self, capsys):
-        """vprint should not print when VERBOSE is False."""
-        original_verbose = layer_config.VERBOSE
-        try:
-            layer_config.VERBOSE = False
+        assert "test message" in caplog.text
+        assert caplog.records[-1].name == "seaview.layer_config"
+
+    def test_silent_above_debug_level(self, caplog, capsys):
+        """vprint should not log or print when DEBUG is disabled."""
+        with caplog.at_level("INFO", logger="seaview"):
             layer_config.vprint("test message")
-            captured = capsys.readouterr()
-            assert captured.out == ""
-        finally:
-            layer_config.VERBOSE = original_verbose
+        assert "test message" not in caplog.text
+        assert capsys.readouterr().out == ""
@@ -74,6 +74,28 @@ class TestConfig:
         assert isinstance(config.settings["remote_html_dir"], str)
         assert isinstance(config.settings["remote_tile_dir"], str)
 
+    def test_settings_are_built_on_first_access(self):
+        """config.settings should not build the settings object on import."""
+        with patch.object(config, '_settings', None), \
+             patch.object(config, '_build_settings') as mock_build:
+            settings = config.settings
+            mock_build.assert_not_called()
+            settings.get("lat1")
+            mock_build.assert_called_once()
+
+    def test_environments_are_detected_positively(self, tmp_path, monkeypatch):
+        """_uses_environments should look for environment tables or an env variable."""
+        monkeypatch.delenv("SEAVIEW_ENV", raising=False)
+        monkeypatch.delenv("ENV_FOR_DYNACONF", raising=False)
+        envs = tmp_path / "envs.toml"
+        envs.write_text('[default]\nlat1 = 10\n[default.ssh]\nvmin = -1\n')
+        flat = tmp_path / "flat.toml"
+        flat.write_text('lat1 = 10\n[ssh]\nvmin = -1\n[new_product]\nvmin = 0\n')
+        assert config._uses_environments([envs])
+        assert not config._uses_environments([flat])
+        monkeypatch.setenv("SEAVIEW_ENV", "OMI")
+        assert config._uses_environments([flat])
+
     def test_change_env_function_exists(self):
         """change_env function should exist and be callable."""
         assert callable(config.change_env)
@@ -262,6 +284,51 @@ class TestSlippyTileGenerator:
             png_files = list(Path(tmpdir).rglob("*.png"))
             assert len(png_files) > 0
 
+    def test_generate_tiles_skips_existing_tiles(self):
+        """generate_tiles(skip_existing=True) should keep tiles already written."""
+        gen = SlippyTileGenerator(min_lat=-5, max_lat=5, min_lon=-5, max_lon=5)
+        lats = np.linspace(-5, 5, 50)
+        lons = np.linspace(-5, 5, 50)
+        data = np.ones((50, 50))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            existing = Path(tmpdir) / "0" / "0" / "0.png"
+            existing.parent.mkdir(parents=True)
+            existing.write_bytes(b"kept")
+            gen.generate_tiles(scene_data=data, scene_lats=lats, scene_lons=lons,
+                               output_dir=tmpdir, zoom_levels=[0, 1],
+                               num_workers=1, skip_existing=True)
+
+            assert existing.read_bytes() == b"kept"
+            assert list((Path(tmpdir) / "1").rglob("*.png"))
+
+    def test_existing_tiles_ignores_stray_files(self):
+        """_existing_tiles should only list tiles named by their indices."""
+        from seaview.tilers.rectlinear import _existing_tiles
+        with tempfile.TemporaryDirectory() as tmpdir:
+            column = Path(tmpdir) / "3"
+            column.mkdir()
+            for name in ("4.png", "foo.png", "5.png.123.tmp"):
+                (column / name).touch()
+            (Path(tmpdir) / "notes").mkdir()
+            assert _existing_tiles(Path(tmpdir)) == {(3, 4)}
+
+    def test_generate_tiles_recreates_removed_directories(self):
+        """generate_tiles should write to tile directories removed since a
+        previous call in the same process."""
+        import shutil
+        gen = SlippyTileGenerator(min_lat=60, max_lat=70, min_lon=0, max_lon=10)
+        lats = np.linspace(-5, 5, 10)
+        lons = np.linspace(-5, 5, 10)
+        data = np.ones((10, 10))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for _ in range(2):
+                shutil.rmtree(tmpdir)
+                gen.generate_tiles(scene_data=data, scene_lats=lats, scene_lons=lons,
+                                   output_dir=tmpdir, zoom_levels=[3], num_workers=1,
+                                   vmin=0, vmax=2)
+            assert list(Path(tmpdir).rglob("*.png"))
+
     def test_generate_tiles_handles_descending_coordinates(self):
         """generate_tiles() should correctly handle descending lat/lon arrays."""
         gen = SlippyTileGenerator(min_lat=-5, max_lat=5, min_lon=-5, max_lon=5)
@@ -359,6 +426,154 @@ class TestSlippyTileGenerator:
             png_files = list(Path(tmpdir).rglob("*.png"))
             assert len(png_files) > 0
 
+    def test_gridded_tile_is_transparent_outside_data(self):
+        """Gridded tiles should be opaque over the data and clear elsewhere."""
+        from PIL import Image
+        gen = SlippyTileGenerator(min_lat=-5, max_lat=5, min_lon=-5, max_lon=5)
+
+        lats = np.linspace(-5, 5, 50)
+        lons = np.linspace(-5, 5, 50)
+        data = np.ones((50, 50))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            gen.generate_tiles(
+                scene_data=data,
+                scene_lats=lats,
+                scene_lons=lons,
+                output_dir=tmpdir,
+                zoom_levels=[0],
+                num_workers=1,
+                vmin=0,
+                vmax=2,
+            )
+
+            alpha = np.asarray(Image.open(Path(tmpdir) / "0" / "0" / "0.png"))[..., 3]
+            assert alpha[128, 128] == 255
+            assert alpha[0, 0] == 0
+
+    def test_gridded_tile_png_returns_png_bytes(self):
+        """_gridded_tile_png should encode a tile without writing it to disk."""
+        import io
+        from PIL import Image
+        from seaview.tilers.rectlinear import (_gridded_tile_png, _empty_tile_png,
+                                               _band_lut, _level_edges)
+        lats = np.linspace(-5, 5, 50)
+        lons = np.linspace(-5, 5, 50)
+        data = np.ones((50, 50), dtype=np.float32)
+        style = dict(lut=_band_lut("viridis", 20, 0, 2), levels=_level_edges(20, 0, 2))
+
+        png = _gridded_tile_png(0, 0, 0, lats, lons, data, **style)
+        alpha = np.asarray(Image.open(io.BytesIO(png)))[..., 3]
+        assert alpha[128, 128] == 255
+        assert alpha[0, 0] == 0
+        assert _gridded_tile_png(5, 0, 0, lats, lons, data, **style) == _empty_tile_png()
+
+    def test_gridded_tile_png_single_row_is_empty(self):
+        """_gridded_tile_png should return an empty tile for a one-row grid."""
+        from seaview.tilers.rectlinear import (_gridded_tile_png, _empty_tile_png,
+                                               _band_lut, _level_edges)
+        lats = np.array([0.0])
+        lons = np.linspace(-5, 5, 50)
+        data = np.ones((1, 50), dtype=np.float32)
+        style = dict(lut=_band_lut("viridis", 20, 0, 2), levels=_level_edges(20, 0, 2))
+
+        assert _gridded_tile_png(0, 0, 0, lats, lons, data, **style) == _empty_tile_png()
+        assert _gridded_tile_png(0, 0, 0, lons, lats, data.T, **style) == _empty_tile_png()
+
+    def test_intersecting_checks_data_footprint(self):
+        """_intersecting should only accept tiles overlapping the data bounds."""
+        import mercantile
+        from seaview.tilers.rectlinear import _intersecting
+        footprint = (-5.0, -5.0, 5.0, 5.0)
+        tiles = [mercantile.tile(0, 0, 5), mercantile.tile(120, 60, 5)]
+        assert _intersecting(tiles, footprint).tolist() == [True, False]
+        assert not _intersecting(tiles, None).any()
+
+    def test_tile_bounds_match_mercantile(self):
+        """_tile_bounds should agree with mercantile.bounds."""
+        import mercantile
+        from seaview.tilers.rectlinear import _tile_bounds
+        tiles = list(mercantile.tiles(-20, -10, 30, 40, 6))
+        bounds = _tile_bounds([t.x for t in tiles], [t.y for t in tiles], 6)
+        expected = np.array([mercantile.bounds(t) for t in tiles]).T
+        np.testing.assert_allclose(np.array(bounds), expected, atol=1e-9)
+
+    def test_band_lut_has_a_colour_per_band(self):
+        """_band_lut should return one RGBA colour per band plus the extensions."""
+        from seaview.tilers.rectlinear import _band_lut
+        lut = _band_lut("viridis", 10, 0.0, 1.0)
+        assert lut.shape == (11, 4)
+        assert lut.dtype == np.uint8
+
+    def test_band_colormap_uses_lut_colours(self):
+        """_band_colormap should map each band to its LUT colour."""
+        from seaview.tilers.rectlinear import _band_colormap, _band_lut
+        band_cmap, norm = _band_colormap("viridis", 5, 0.0, 1.0)
+        lut = _band_lut("viridis", 5, 0.0, 1.0)
+        rgba = np.round(band_cmap(norm([-1.0, 0.1, 0.9, 2.0])) * 255)
+        np.testing.assert_array_equal(rgba, lut[[0, 1, 4, 5]])
+
+    def test_bucket_select_returns_points_in_box(self):
+        """_bucket_select should return every point inside the box."""
+        from seaview.tilers.rectlinear import _bucket_index, _bucket_select
+        rng = np.random.default_rng(0)
+        x, y = rng.uniform(0, 100, 1000), rng.uniform(0, 100, 1000)
+        order, index = _bucket_index(x, y, n=16)
+        x, y = x[order], y[order]
+        sel = _bucket_select(index, 20, 40, 60, 80)
+        inside = (x >= 20) & (x <= 40) & (y >= 60) & (y <= 80)
+        assert set(np.flatnonzero(inside)) <= set(sel)
+
+    def test_triangle_areas(self):
+        """_triangle_areas should return the area of each triangle."""
+        from seaview.tilers.rectlinear import _triangle_areas
+        x = np.array([0.0, 2.0, 0.0, 2.0])
+        y = np.array([0.0, 0.0, 3.0, 3.0])
+        triangles = np.array([[0, 1, 2], [1, 3, 2]])
+        np.testing.assert_allclose(_triangle_areas(x, y, triangles), [3.0, 3.0])
+
+    def test_grid_triangle_area_at_equator(self):
+        """_grid_triangle_area should be half a grid cell in Web Mercator."""
+        from seaview.tilers.rectlinear import _grid_triangle_area, lonlat_to_webmercator
+        x, y = lonlat_to_webmercator(np.array([0.0, 0.1]), np.array([0.0, 0.1]))
+        expected = 0.5 * (x[1] - x[0]) * (y[1] - y[0])
+        assert _grid_triangle_area((0.1, 0.1), 0.0) == pytest.approx(expected, rel=1e-3)
+
+    def test_grid_triangle_area_keeps_high_latitude_triangles(self):
+        """No triangle of a regular grid at 65-75N should be masked as a gap."""
+        from matplotlib import tri
+        from seaview.tilers.rectlinear import (_grid_triangle_area, _triangle_areas,
+                                               lonlat_to_webmercator)
+        lon_grid, lat_grid = np.meshgrid(np.arange(0, 10.01, 0.25),
+                                         np.arange(65, 75.01, 0.25))
+        x, y = lonlat_to_webmercator(lon_grid.ravel(), lat_grid.ravel())
+        triang = tri.Triangulation(x, y)
+        areas = _triangle_areas(triang.x, triang.y, triang.triangles)
+        expected = _grid_triangle_area((0.25, 0.25),
+                                       triang.y[triang.triangles].mean(axis=1))
+        assert not np.any(areas > 3 * expected)
+
+    def test_transformer_is_per_thread(self):
+        """_get_transformer should reuse one transformer per thread."""
+        import threading
+        from seaview import utils
+        other = []
+        thread = threading.Thread(target=lambda: other.append(utils._get_transformer()))
+        thread.start()
+        thread.join()
+        assert utils._get_transformer() is utils._get_transformer()
+        assert other[0] is not utils._get_transformer()
+
+    def test_separable_webmercator_matches_full_transform(self):
+        """Transforming grid axes should match transforming every point."""
+        from seaview import utils
+        lons, lats = np.linspace(-20, 30, 7), np.linspace(-60, 70, 5)
+        x_axis, y_axis = utils.lonlat_to_webmercator_separable(lons, lats)
+        lon_grid, lat_grid = np.meshgrid(lons, lats)
+        x, y = utils.lonlat_to_webmercator(lon_grid, lat_grid)
+        np.testing.assert_allclose(np.broadcast_to(x_axis, x.shape), x)
+        np.testing.assert_allclose(np.broadcast_to(y_axis[:, None], y.shape), y)
+
     def test_tile_size_constant(self):
         """TILE_SIZE should be 256 (standard slippy map tile size)."""
         assert SlippyTileGenerator.TILE_SIZE == 256
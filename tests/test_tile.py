@@ -1,6 +1,7 @@
 """Tests for the seaview.tile module."""
 
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
@@ -16,12 +17,13 @@ class TestTilesExists:
     """Tests for the tiles_exists function."""
 
     @patch.object(tile, 'settings')
-    def test_returns_true_when_dir_exists(self, mock_settings):
-        """tiles_exists should return True when tile directory exists."""
+    def test_returns_true_when_tiles_done(self, mock_settings):
+        """tiles_exists should return True when the tiles were completed."""
         with tempfile.TemporaryDirectory() as tmpdir:
             # Create the tile directory
             tile_path = Path(tmpdir) / "ssh" / "2025-01-15"
             tile_path.mkdir(parents=True)
+            (tile_path / ".done").touch()
 
             mock_settings.__getitem__ = MagicMock(return_value=tmpdir)
 
@@ -37,12 +39,37 @@ class TestTilesExists:
             result = tile.tiles_exists("ssh", "2025-01-15")
             assert result is False
 
+    @patch.object(tile, 'settings')
+    def test_returns_false_for_interrupted_run(self, mock_settings):
+        """tiles_exists should return False for a directory without marker."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            (Path(tmpdir) / "ssh" / "2025-01-15").mkdir(parents=True)
+
+            mock_settings.__getitem__ = MagicMock(return_value=tmpdir)
+
+            assert tile.tiles_exists("ssh", "2025-01-15") is False
+
+    @patch.object(tile, 'settings')
+    def test_marks_tiles_from_before_the_markers(self, mock_settings):
+        """tiles_exists should treat tile directories of older versions as done."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            legacy = Path(tmpdir) / "ssh" / "2025-01-14"
+            (legacy / "3").mkdir(parents=True)
+
+            mock_settings.__getitem__ = MagicMock(return_value=tmpdir)
+
+            assert tile.tiles_exists("ssh", "2025-01-14") is True
+            # Directories created after the migration need their marker
+            (Path(tmpdir) / "ssh" / "2025-01-15" / "3").mkdir(parents=True)
+            assert tile.tiles_exists("ssh", "2025-01-15") is False
+
     @patch.object(tile, 'settings')
     def test_handles_various_date_formats(self, mock_settings):
         """tiles_exists should handle various date input formats."""
         with tempfile.TemporaryDirectory() as tmpdir:
             tile_path = Path(tmpdir) / "ssh" / "2025-01-15"
             tile_path.mkdir(parents=True)
+            (tile_path / ".done").touch()
 
             mock_settings.__getitem__ = MagicMock(return_value=tmpdir)
 
@@ -55,6 +82,13 @@ class TestTilesExists:
             # Different date format
             assert tile.tiles_exists("ssh", "2025/01/15") is True
 
+            # Same UTC day as the data files of the date
+            from datetime import datetime, timedelta, timezone
+            late = datetime(2025, 1, 15, 23, 30, tzinfo=timezone(timedelta(hours=-3)))
+            assert tile.tiles_exists("ssh", late) is False
+            # Naive times are taken as they are
+            assert tile.tiles_exists("ssh", late.replace(tzinfo=None)) is True
+
 
 class TestSSH:
     """Tests for the ssh function."""
@@ -62,9 +96,10 @@ class TestSSH:
     @patch.object(tile, 'cmems_ssh')
     @patch.object(tile, 'rectlin_tiler')
     @patch.object(tile, 'settings')
+    @patch.object(tile, '_source_is_newer', return_value=False)
     @patch.object(tile, 'tiles_exists')
     def test_skips_when_tiles_exist_and_no_force(
-        self, mock_exists, mock_settings, mock_tiler, mock_cmems
+        self, mock_exists, mock_newer, mock_settings, mock_tiler, mock_cmems
     ):
         """ssh should skip processing when tiles exist and force=False."""
         mock_exists.return_value = True
@@ -92,7 +127,7 @@ class TestSSH:
         mock_ds.longitude.max.return_value = 20
         mock_ds.latitude.data = np.linspace(-10, 10, 100)
         mock_ds.longitude.data = np.linspace(-20, 20, 100)
-        mock_ds.sla.data = np.random.randn(100, 100)
+        mock_ds.sla.values = np.random.randn(100, 100)
         mock_cmems.open_dataset.return_value = mock_ds
 
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -104,12 +139,13 @@ class TestSSH:
             tile.ssh("2025-01-15", force=True)
 
             mock_cmems.open_dataset.assert_called_once()
+            assert (Path(tmpdir) / "ssh" / "2025-01-15" / ".done").is_file()
 
     @patch.object(tile, 'cmems_ssh')
     @patch.object(tile, 'settings')
     @patch.object(tile, 'tiles_exists')
     def test_handles_coordinates_out_of_bounds(
-        self, mock_exists, mock_settings, mock_cmems, capsys
+        self, mock_exists, mock_settings, mock_cmems, caplog
     ):
         """ssh should handle CoordinatesOutOfDatasetBounds gracefully."""
         from copernicusmarine import CoordinatesOutOfDatasetBounds
@@ -120,8 +156,33 @@ class TestSSH:
         # Should not raise
         tile.ssh("2025-01-15", force=True)
 
-        captured = capsys.readouterr()
-        assert "failed" in captured.out.lower()
+        assert "failed" in caplog.text.lower()
+
+
+class TestSourceIsNewer:
+    """Tests for the _source_is_newer function."""
+
+    @patch.object(tile, 'cmems_ssh')
+    @patch.object(tile, 'settings')
+    def test_compares_data_file_and_tile_dir(self, mock_settings, mock_cmems):
+        """_source_is_newer should be True only for data newer than the tiles."""
+        import os
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tile_path = Path(tmpdir) / "ssh" / "2025-01-15" / ".done"
+            tile_path.parent.mkdir(parents=True)
+            tile_path.touch()
+            data_file = Path(tmpdir) / "data.nc"
+            data_file.touch()
+            mock_settings.__getitem__ = MagicMock(return_value=tmpdir)
+            mock_cmems.datadir.return_value = Path(tmpdir)
+            mock_cmems.filename.return_value = "data.nc"
+
+            os.utime(tile_path, (2000, 2000))
+            os.utime(data_file, (1000, 1000))
+            assert tile._source_is_newer("ssh", "2025-01-15") is False
+
+            os.utime(data_file, (3000, 3000))
+            assert tile._source_is_newer("ssh", "2025-01-15") is True
 
 
 class TestSST:
@@ -140,9 +201,10 @@ class TestOstia:
     @patch.object(tile, 'ostia_sst')
     @patch.object(tile, 'rectlin_tiler')
     @patch.object(tile, 'settings')
+    @patch.object(tile, '_source_is_newer', return_value=False)
     @patch.object(tile, 'tiles_exists')
     def test_skips_when_tiles_exist_and_no_force(
-        self, mock_exists, mock_settings, mock_tiler, mock_ostia
+        self, mock_exists, mock_newer, mock_settings, mock_tiler, mock_ostia
     ):
         """ostia should skip processing when tiles exist and force=False."""
         mock_exists.return_value = True
@@ -151,6 +213,34 @@ class TestOstia:
 
         mock_ostia.open_dataset.assert_not_called()
 
+    @patch.object(tile, 'ostia_sst')
+    @patch.object(tile, 'rectlin_tiler')
+    @patch.object(tile, 'settings')
+    @patch.object(tile, 'tiles_exists')
+    def test_converts_kelvin_to_celsius(
+        self, mock_exists, mock_settings, mock_tiler, mock_ostia
+    ):
+        """ostia should pass the SST in degrees Celsius to the tiler."""
+        mock_exists.return_value = False
+        mock_ds = MagicMock()
+        mock_ds.analysed_sst = xr.DataArray(np.full((1, 4, 4), 293.15))
+        mock_ostia.open_dataset.return_value = mock_ds
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            mock_settings.__getitem__ = MagicMock(side_effect=lambda k: {
+                "tile_dir": tmpdir,
+                "zoom_levels": [0],
+                "ostia": {"cmap": "viridis", "vmin": 10, "vmax": 28},
+            }.get(k))
+
+            tile.ostia("2025-01-15", force=True)
+
+        generate = mock_tiler.SlippyTileGenerator.return_value.generate_tiles
+        data = generate.call_args[0][0]
+        assert data.shape == (4, 4)
+        assert data.dtype == np.float32
+        np.testing.assert_allclose(data, 20.0, rtol=1e-5)
+
 
 class TestGlobcolour:
     """Tests for the globcolour function."""
@@ -158,9 +248,10 @@ class TestGlobcolour:
     @patch.object(tile, 'cmems_globcolour')
     @patch.object(tile, 'rectlin_tiler')
     @patch.object(tile, 'settings')
+    @patch.object(tile, '_source_is_newer', return_value=False)
     @patch.object(tile, 'tiles_exists')
     def test_skips_when_tiles_exist_and_no_force(
-        self, mock_exists, mock_settings, mock_tiler, mock_globcolour
+        self, mock_exists, mock_newer, mock_settings, mock_tiler, mock_globcolour
     ):
         """globcolour should skip processing when tiles exist and force=False."""
         mock_exists.return_value = True
@@ -170,6 +261,27 @@ class TestGlobcolour:
         mock_globcolour.open_dataset.assert_not_called()
 
 
+class TestCoordRange:
+    """Tests for the coordinate range helper."""
+
+    def test_uses_end_points_of_1d_coordinates(self):
+        """_coord_range should handle ascending and descending coordinates."""
+        assert tile._coord_range(xr.DataArray(np.linspace(-10, 10, 5))) == (-10, 10)
+        assert tile._coord_range(xr.DataArray(np.linspace(10, -10, 5))) == (-10, 10)
+
+
+class TestLogChlorophyll:
+    """Tests for the chlorophyll log transform."""
+
+    def test_masks_invalid_values(self):
+        """_log_chlorophyll should return NaN for invalid values."""
+        data = np.array([1.0, np.e, 0.0, -1.0, np.nan], dtype=np.float32)
+        result = tile._log_chlorophyll(data)
+
+        np.testing.assert_allclose(result[:2], [0.0, 1.0], rtol=1e-6)
+        assert np.isnan(result[2:]).all()
+
+
 class TestBathy:
     """Tests for the bathy function."""
 
@@ -184,6 +296,7 @@ class TestBathy:
             # Create the tile directory
             tile_path = Path(tmpdir) / "gebco"
             tile_path.mkdir(parents=True)
+            (tile_path / ".done").touch()
 
             mock_settings.__getitem__ = MagicMock(return_value=tmpdir)
 
@@ -195,10 +308,12 @@ class TestBathy:
 class TestAll:
     """Tests for the all function."""
 
+    @patch.object(tile, '_process_pool', ThreadPoolExecutor)
+    @patch.object(tile, '_fetch')
     @patch.object(tile, 'globcolour')
     @patch.object(tile, 'sst')
     @patch.object(tile, 'ssh')
-    def test_calls_all_tile_generators(self, mock_ssh, mock_sst, mock_globcolour):
+    def test_calls_all_tile_generators(self, mock_ssh, mock_sst, mock_globcolour, mock_fetch):
         """all should call ssh, sst, and globcolour functions."""
         tile.all("2025-01-15", force=True, verbose=False)
 
@@ -206,6 +321,90 @@ class TestAll:
         mock_sst.assert_called_once_with("2025-01-15", verbose=False, force=True)
         mock_globcolour.assert_called_once_with("2025-01-15", verbose=False, force=True)
 
+    @patch.object(tile, '_source_is_newer', return_value=False)
+    @patch.object(tile, 'tiles_exists', return_value=True)
+    @patch.object(tile, '_process_pool')
+    def test_no_pool_when_tiles_are_done(self, mock_pool, mock_exists, mock_newer):
+        """all should not start any workers when every product is up to date."""
+        tile.all("2025-01-15")
+
+        mock_pool.assert_not_called()
+
+    @patch.object(tile, '_fetch')
+    def test_rejects_future_dates(self, mock_fetch):
+        """all should raise DateInFutureError before downloading anything."""
+        from datetime import date, timedelta
+        from seaview import DateInFutureError
+        with pytest.raises(DateInFutureError):
+            tile.all(date.today() + timedelta(days=1))
+        mock_fetch.assert_not_called()
+
+
+class TestPrefetch:
+    """Tests for the prefetch function."""
+
+    @patch.object(tile, 'cmems_globcolour')
+    @patch.object(tile, 'ostia_sst')
+    @patch.object(tile, 'cmems_ssh')
+    def test_failed_product_does_not_stop_others(self, mock_ssh, mock_ostia,
+                                                 mock_globcolour, caplog):
+        """prefetch should report a failing product and fetch the others."""
+        mock_ssh.retrieve_range.side_effect = OSError("connection reset")
+
+        tile.prefetch("2025-01-10", "2025-01-15")
+
+        mock_ostia.retrieve_range.assert_called_once()
+        mock_globcolour.retrieve_range.assert_called_once()
+        assert "connection reset" in caplog.text
+
+
+class TestProcessPool:
+    """Tests for the _process_pool helper."""
+
+    @patch.object(tile, 'settings')
+    def test_workers_are_not_forked(self, mock_settings):
+        """_process_pool should start workers from a forkserver with the settings."""
+        mock_settings.as_dict.return_value = {"LAT1": 10, "TILES_UPDATED": True}
+        mock_settings.get.return_value = False
+        pool = tile._process_pool(2)
+        try:
+            assert pool._mp_context.get_start_method() == "forkserver"
+            assert pool._initargs == ({"LAT1": 10}, False)
+        finally:
+            pool.shutdown()
+
+
+class TestDispatch:
+    """Tests for the _dispatch worker function."""
+
+    @patch.object(tile, '_upload')
+    @patch.object(tile, 'settings')
+    @patch.object(tile, 'sst')
+    def test_uploads_new_tiles_in_direct_mode(self, mock_sst, mock_settings, mock_upload):
+        """_dispatch should upload the product directory in direct mode."""
+        values = {"tiles_updated": False, "upload_mode": "direct", "remote_sync": True}
+        mock_settings.get.side_effect = values.get
+        mock_settings.set.side_effect = values.__setitem__
+        mock_sst.side_effect = lambda *args, **kwargs: values.update(tiles_updated=True)
+
+        assert tile._dispatch(("sst", "2025-01-15", False, False)) is True
+
+        mock_upload.assert_called_once_with("ostia", "2025-01-15")
+
+    @patch.object(tile, '_upload')
+    @patch.object(tile, 'settings')
+    @patch.object(tile, 'ssh')
+    def test_does_not_upload_by_default(self, mock_ssh, mock_settings, mock_upload):
+        """_dispatch should leave the upload to sync without direct mode."""
+        values = {"tiles_updated": False, "remote_sync": True}
+        mock_settings.get.side_effect = values.get
+        mock_settings.set.side_effect = values.__setitem__
+        mock_ssh.side_effect = lambda *args, **kwargs: values.update(tiles_updated=True)
+
+        assert tile._dispatch(("ssh", "2025-01-15", False, False)) is True
+
+        mock_upload.assert_not_called()
+
 
 class TestSync:
     """Tests for the sync function."""
@@ -227,3 +426,65 @@ class TestSync:
         assert call_kwargs["destination"] == "/remote/tiles"
         assert call_kwargs["destination_ssh"] == "tvarminne"
         assert "-az" in call_kwargs["options"]
+        assert "--exclude=.done" in call_kwargs["options"]
+        assert "--exclude=*.tmp" in call_kwargs["options"]
+
+    @patch.object(tile, '_rsync')
+    @patch.object(tile, 'settings')
+    def test_date_sync_opens_connection_first(self, mock_settings, mock_rsync):
+        """sync of a date should transfer one directory before the others."""
+        import threading
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for product in ("ssh", "ostia", "globcolour"):
+                (Path(tmpdir) / product / "2025-01-15").mkdir(parents=True)
+            mock_settings.__getitem__ = MagicMock(return_value=tmpdir)
+            mock_settings.get.side_effect = {"remote_tile_dir": "/remote/tiles"}.get
+            threads = []
+            mock_rsync.side_effect = lambda *args: threads.append(threading.current_thread())
+
+            tile.sync("2025-01-15")
+
+        assert mock_rsync.call_count == 3
+        assert threads[0] is threading.main_thread()
+
+    @patch('sysrsync.run')
+    @patch.object(tile, 'settings')
+    def test_date_sync_skipped_in_direct_mode(self, mock_settings, mock_rsync):
+        """sync of a date should do nothing when tiles are uploaded directly."""
+        mock_settings.get.side_effect = {"upload_mode": "direct", "remote_sync": True}.get
+
+        tile.sync("2025-01-15")
+
+        mock_rsync.assert_not_called()
+
+    @patch.object(tile.time, 'sleep')
+    @patch('sysrsync.run')
+    @patch.object(tile, 'settings')
+    def test_retries_failed_transfer(self, mock_settings, mock_rsync, mock_sleep):
+        """sync should retry a failed rsync before giving up."""
+        mock_settings.__getitem__ = MagicMock(side_effect=lambda k: {
+            "tile_dir": "/local/tiles",
+            "remote_tile_dir": "/remote/tiles"
+        }.get(k))
+        mock_rsync.side_effect = [OSError("connection reset"), None]
+
+        tile.sync()
+
+        assert mock_rsync.call_count == 2
+        mock_sleep.assert_called_once_with(1)
+
+    @patch('sysrsync.run')
+    @patch.object(tile, 'settings')
+    def test_ssh_command_is_a_separate_argument(self, mock_settings, mock_rsync):
+        """sync should pass the ssh command unquoted after --rsh."""
+        mock_settings.__getitem__ = MagicMock(side_effect=lambda k: {
+            "tile_dir": "/local/tiles",
+            "remote_tile_dir": "/remote/tiles"
+        }.get(k))
+
+        tile.sync()
+
+        options = mock_rsync.call_args[1]["options"]
+        rsh = options[options.index("--rsh") + 1]
+        assert rsh.startswith("ssh ")
+        assert "ControlMaster=auto" in rsh